@@ -0,0 +1,73 @@
+'''
+Payload size and build time of query requests with chained filters and a
+large OR of EqualClause, sent as is and normalized/compiled.
+
+    $ python -m benchmarks.bench_clauses
+'''
+import json
+import time
+
+from kii.data import clauses as cl
+from kii.data.application import QueryForObjects
+
+
+FILTERS = 20
+KEYS = 500
+PAGES = 200
+
+
+class Scope:
+    '''
+    enough of a bucket scope to build request bodies without a server
+    '''
+    bucket_id = 'bench_bucket'
+    query_cache = None
+
+    class api:
+        app_id = 'app'
+        endpoint_url = 'http://localhost'
+
+
+def build_query():
+    query = QueryForObjects(Scope(), cl.OrClause(*[cl.EqualClause('key', i) for i in range(KEYS)]))
+    for i in range(FILTERS):
+        query = query.filter(cl.RangeClause('index').ge(0), cl.AllClause())
+    return query.order_by('index', False)
+
+
+def raw_body(query, pagination_key):
+    # what every page sent before: the clause tree serialized as built
+    params = {
+        'bucketQuery': {
+            'clause': query.clause.query(),
+            'orderBy': query._order_by,
+            'descending': query._descending,
+        },
+        'paginationKey': pagination_key,
+    }
+    return json.dumps(params).encode('utf-8')
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for i in range(PAGES):
+        body = fn(str(i))
+    return body, (time.perf_counter() - start) / PAGES
+
+
+def main():
+    query = build_query()
+
+    body, elapsed = timed(lambda key: raw_body(query, key))
+    print('as built : {0:7} bytes  {1:8.1f} us/page'.format(len(body), elapsed * 1e6))
+
+    start = time.perf_counter()
+    query._payload()
+    first = time.perf_counter() - start
+    body, elapsed = timed(lambda key: query.clone().pagination_key(key)._payload())
+    print('compiled : {0:7} bytes  {1:8.1f} us/page ({2:.1f} us to compile once)'.format(
+        len(body), elapsed * 1e6, first * 1e6))
+
+
+if __name__ == '__main__':
+    main()
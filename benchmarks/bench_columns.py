@@ -0,0 +1,57 @@
+'''
+Time and peak memory of building columns of a bucket: iterating
+QueryResult into lists by hand versus QueryForObjects.to_columns().
+
+    $ python -m benchmarks.bench_columns
+'''
+import time
+import tracemalloc
+
+from benchmarks import stub
+
+
+PAGE_SIZE = 200
+OBJECTS = 20000
+BUCKET_ID = 'bench_bucket'
+FIELDS = ['_created', 'index', 'score', 'name']
+
+
+def setup(store):
+    store.fill(BUCKET_ID, OBJECTS,
+               lambda i: {'index': i, 'score': i / 3, 'name': 'object {0}'.format(i)})
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    columns = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert all(len(columns[field]) == OBJECTS for field in FIELDS)
+    return elapsed, peak
+
+
+def main():
+    server = stub.spawn(setup, page_size=PAGE_SIZE)
+    api = stub.api(server)
+    bucket = api.data.application(BUCKET_ID)
+
+    def by_hand():
+        rows = [dict(obj) for obj in bucket.query().all()]
+        return {field: [row.get(field) for row in rows] for field in FIELDS}
+
+    def to_columns():
+        return bucket.query().to_columns(FIELDS)
+
+    for name, build in (('by hand', by_hand), ('to_columns', to_columns)):
+        elapsed, peak = measure(build)
+        print('{0:<11} {1:6.2f} s  peak {2:8.1f} KiB'.format(name, elapsed, peak / 1024))
+
+    api.close()
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+'''
+Wall-clock time of looking up many keys with one InClause query and with
+fan_out over chunks of the keys, against a stub server (in a child process)
+that adds a fixed latency to every request.
+
+    $ python -m benchmarks.bench_fan_out
+'''
+import time
+
+from benchmarks import stub
+from kii.data import clauses
+
+
+OBJECTS = 8000
+KEYS = 2000
+PAGE_SIZE = 200
+LATENCY = 0.15  # seconds per request, roughly a cross-region round trip
+BUCKET_ID = 'bench_bucket'
+
+
+def lookup(objects):
+    start = time.perf_counter()
+    count = sum(1 for _ in objects)
+    return count, time.perf_counter() - start
+
+
+def main():
+    server = stub.spawn(lambda store: store.fill(BUCKET_ID, OBJECTS),
+                        page_size=PAGE_SIZE, latency=LATENCY)
+    api = stub.api(server, pool_maxsize=16)
+    bucket = api.data.application(BUCKET_ID)
+    query = bucket.query(clauses.InClause('index', list(range(0, OBJECTS, OBJECTS // KEYS))))
+
+    count, serial = lookup(query.stream())
+    print('stream                  : {0:5} objects {1:.2f}s'.format(count, serial))
+    for concurrency in (4, 8, 16):
+        count, elapsed = lookup(query.fan_out(PAGE_SIZE, concurrency=concurrency))
+        print('fan_out(concurrency={0:2}): {1:5} objects {2:.2f}s ({3:.2f}x)'.format(
+            concurrency, count, elapsed, serial / elapsed))
+
+    query.order_by('index', False)
+    count, elapsed = lookup(query.fan_out(PAGE_SIZE, concurrency=16))
+    print('ordered fan_out(16)     : {0:5} objects {1:.2f}s ({2:.2f}x)'.format(
+        count, elapsed, serial / elapsed))
+
+    api.close()
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
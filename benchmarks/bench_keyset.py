@@ -0,0 +1,52 @@
+'''
+Cost of reading the page at a given depth with offset() and with
+keyset pagination (page() and a token), against a local stub server.
+
+    $ python -m benchmarks.bench_keyset
+'''
+import time
+
+from benchmarks import stub
+
+
+OBJECTS = 10000
+PAGE_SIZE = 200
+SIZE = 50
+BUCKET_ID = 'bench_bucket'
+
+
+def measure(server, fn):
+    requests = server.store.requests
+    start = time.perf_counter()
+    page = fn()
+    return page, server.store.requests - requests, time.perf_counter() - start
+
+
+def main():
+    server = stub.serve(page_size=PAGE_SIZE)
+    server.store.fill(BUCKET_ID, OBJECTS)
+    api = stub.api(server)
+    query = api.data.application(BUCKET_ID).query().order_by('_created', False)
+
+    # tokens as a client would have kept them while paging
+    tokens = {0: None}
+    for number, page in enumerate(query.pages(SIZE), 1):
+        tokens[number] = page.next_token
+
+    print('{0:>6}  {1:>22}  {2:>22}'.format('depth', 'offset', 'page token'))
+    for depth in (0, 1000, 5000, 9900):
+        offset = query.clone().offset(depth).limit(SIZE)
+        items, offset_requests, offset_time = measure(server, lambda: list(offset.stream()))
+        page, keyset_requests, keyset_time = measure(
+            server, lambda: query.page(SIZE, tokens[depth // SIZE]))
+        assert [o._id for o in items] == [o._id for o in page]
+        print('{0:6}  {1:3} requests {2:7.1f} ms  {3:3} requests {4:7.1f} ms'.format(
+            depth, offset_requests, offset_time * 1000, keyset_requests, keyset_time * 1000))
+
+    api.close()
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
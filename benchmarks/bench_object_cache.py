@@ -0,0 +1,48 @@
+'''
+Repeated retrieve_an_object of a few hot 20KB objects without a cache,
+with a cache revalidated on every read (ttl=0, 304 responses) and with
+a fresh cache (ttl=60).
+
+    $ python -m benchmarks.bench_object_cache
+'''
+import time
+
+from benchmarks import stub
+
+
+READS = 2000
+HOT_OBJECTS = 10
+BUCKET_ID = 'bench_bucket'
+
+
+def run(server, object_ids, ttl=None):
+    api = stub.api(server)
+    if ttl is not None:
+        api.data.application.enable_object_cache(ttl=ttl)
+    bucket = api.data.application(BUCKET_ID)
+
+    requests = server.store.requests
+    start = time.perf_counter()
+    for i in range(READS):
+        bucket.retrieve_an_object(object_ids[i % len(object_ids)])
+    elapsed = time.perf_counter() - start
+
+    api.close()
+    return READS / elapsed, server.store.requests - requests
+
+
+def main():
+    server = stub.serve()
+    server.store.fill(BUCKET_ID, HOT_OBJECTS, lambda i: {'index': i, 'payload': 'x' * 20000})
+    object_ids = list(server.store.bucket(BUCKET_ID))
+
+    for name, ttl in (('no cache', None), ('ttl=0', 0), ('ttl=60', 60)):
+        rate, requests = run(server, object_ids, ttl)
+        print('{0:<9} {1:9.1f} reads/s  {2:5} requests'.format(name, rate, requests))
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
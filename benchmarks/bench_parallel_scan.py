@@ -0,0 +1,44 @@
+'''
+Wall-clock time of a full-bucket scan with one pagination chain and with
+parallel_scan over N _created partitions, against a stub server (in a child
+process) that adds a fixed latency to every request.
+
+    $ python -m benchmarks.bench_parallel_scan
+'''
+import time
+
+from benchmarks import stub
+
+
+OBJECTS = 4000
+PAGE_SIZE = 200
+LATENCY = 0.15  # seconds per request, roughly a cross-region round trip
+BUCKET_ID = 'bench_bucket'
+
+
+def scan(objects):
+    start = time.perf_counter()
+    count = sum(1 for _ in objects)
+    return count, time.perf_counter() - start
+
+
+def main():
+    server = stub.spawn(lambda store: store.fill(BUCKET_ID, OBJECTS),
+                        page_size=PAGE_SIZE, latency=LATENCY)
+    api = stub.api(server, pool_maxsize=16)
+    bucket = api.data.application(BUCKET_ID)
+
+    count, serial = scan(bucket.query().stream())
+    print('stream           : {0:5} objects {1:.2f}s'.format(count, serial))
+    for partitions in (2, 4, 8, 16):
+        count, elapsed = scan(bucket.parallel_scan(partitions))
+        print('parallel_scan({0:2}): {1:5} objects {2:.2f}s ({3:.2f}x)'.format(
+            partitions, count, elapsed, serial / elapsed))
+
+    api.close()
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
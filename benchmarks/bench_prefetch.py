@@ -0,0 +1,44 @@
+'''
+Wall-clock time of a full-bucket scan with and without page prefetching,
+against a local stub server that adds a fixed latency to every request.
+
+    $ python -m benchmarks.bench_prefetch
+'''
+import time
+
+from benchmarks import stub
+
+
+OBJECTS = 2000
+PAGE_SIZE = 200
+LATENCY = 0.15  # seconds per request, roughly a cross-region round trip
+WORK = 0.00075  # seconds of processing per object, about one round trip per page
+BUCKET_ID = 'bench_bucket'
+
+
+def scan(query):
+    start = time.perf_counter()
+    for _ in query.all():
+        time.sleep(WORK)
+    return time.perf_counter() - start
+
+
+def main():
+    server = stub.serve(page_size=PAGE_SIZE, latency=LATENCY)
+    server.store.fill(BUCKET_ID, OBJECTS)
+    api = stub.api(server)
+    bucket = api.data.application(BUCKET_ID)
+
+    serial = scan(bucket.query())
+    print('serial      : {0:.2f}s'.format(serial))
+    for pages in (1, 2, 4):
+        elapsed = scan(bucket.query().prefetch(pages))
+        print('prefetch({0}) : {1:.2f}s ({2:.2f}x)'.format(pages, elapsed, serial / elapsed))
+
+    api.close()
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+'''
+Peak memory of a full-bucket scan: cached QueryResult iteration
+versus QueryForObjects.stream(), for growing bucket sizes.
+
+    $ python -m benchmarks.bench_query_stream
+'''
+import tracemalloc
+
+from benchmarks import stub
+
+
+PAGE_SIZE = 100
+SIZES = (1000, 4000, 16000)
+
+
+def peak(scan):
+    tracemalloc.start()
+    scan()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def setup(store):
+    for size in SIZES:
+        store.fill('bench_{0}'.format(size), size,
+                   lambda i: {'index': i, 'payload': 'x' * 100})
+
+
+def main():
+    server = stub.spawn(setup, page_size=PAGE_SIZE)
+    api = stub.api(server)
+
+    for size in SIZES:
+        bucket = api.data.application('bench_{0}'.format(size))
+
+        def cached():
+            count = 0
+            for _ in bucket.query().all():
+                count += 1
+            assert count == size
+
+        def streamed():
+            count = 0
+            for _ in bucket.query().stream():
+                count += 1
+            assert count == size
+
+        print('objects={0:<6} cached: {1:8.1f} KiB  stream: {2:8.1f} KiB'.format(
+            size, peak(cached) / 1024, peak(streamed) / 1024))
+
+    api.close()
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+'''
+Bulk create_an_object through a worker pool against a stub server that
+throttles at THROTTLE requests/second, with and without a client-side
+RateLimiter.
+
+    $ python -m benchmarks.bench_ratelimit
+'''
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from kii import RateLimiter
+from kii import exceptions as exc
+
+from benchmarks import stub
+
+
+THROTTLE = 200
+REQUESTS = 1000
+WORKERS = 16
+BUCKET_ID = 'bench_bucket'
+
+
+def run(server, **kwargs):
+    api = stub.api(server, pool_maxsize=WORKERS, **kwargs)
+    bucket = api.data.application(BUCKET_ID)
+
+    def call(i):
+        try:
+            bucket.create_an_object({'index': i})
+            return True
+        except exc.KiiAPIError:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(WORKERS) as executor:
+        ok = sum(executor.map(call, range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+
+    api.close()
+    return ok, elapsed
+
+
+def main():
+    server = stub.serve(throttle=THROTTLE)
+
+    for name, kwargs in (('unlimited', {}),
+                         ('rate limited', {'rate_limiter': RateLimiter(THROTTLE * 0.95)})):
+        time.sleep(1)  # let the server bucket refill
+        ok, elapsed = run(server, **kwargs)
+        print('{0:<13} created: {1:5}/{2}  failed: {3:5}  {4:7.1f} created/s'.format(
+            name, ok, REQUESTS, REQUESTS - ok, ok / elapsed))
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
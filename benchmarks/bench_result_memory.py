@@ -0,0 +1,49 @@
+'''
+Retained memory per object of a fully iterated QueryResult for each item
+type: ObjectResult (default), ObjectRecord (as_records) and dict (as_dicts).
+
+    $ python -m benchmarks.bench_result_memory
+'''
+import gc
+import tracemalloc
+
+from benchmarks import stub
+
+
+PAGE_SIZE = 200
+OBJECTS = 10000
+BUCKET_ID = 'bench_bucket'
+
+
+def setup(store):
+    store.fill(BUCKET_ID, OBJECTS, lambda i: {'index': i, 'name': 'object {0}'.format(i)})
+
+
+def retained(query):
+    gc.collect()
+    tracemalloc.start()
+    results = query.all()
+    assert len(results) == OBJECTS
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    server = stub.spawn(setup, page_size=PAGE_SIZE)
+    api = stub.api(server)
+    bucket = api.data.application(BUCKET_ID)
+
+    for name, query in (('ObjectResult', bucket.query()),
+                        ('ObjectRecord', bucket.query().as_records()),
+                        ('dict', bucket.query().as_dicts())):
+        print('{0:<13} {1:8.1f} bytes/object'.format(name, retained(query) / OBJECTS))
+
+    api.close()
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
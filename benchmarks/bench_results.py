@@ -0,0 +1,77 @@
+'''
+Micro-benchmarks of result construction without a server:
+decoding a query page into objects with each JSON decoder, checking only
+the status of a response, and repeated timestamp access.
+
+    $ python -m benchmarks.bench_results
+'''
+import json
+import timeit
+
+import requests
+
+from kii import codec, results as rs
+from kii.data.application import QueryForObjects
+
+from benchmarks import stub
+
+
+PAGE_SIZE = 200
+REPEAT = 200
+
+
+def response(body):
+    r = requests.Response()
+    r.status_code = 200
+    r._content = json.dumps(body).encode('utf-8')
+    return r
+
+
+def page():
+    return {
+        'queryDescription': 'bench',
+        'results': [{
+            '_id': 'id-{0}'.format(i),
+            '_created': 1500000000000 + i,
+            '_modified': 1500000000000 + i,
+            '_version': '1',
+            '_owner': 'owner',
+            'index': i,
+            'name': 'object {0}'.format(i),
+            'tags': ['a', 'b', 'c'],
+        } for i in range(PAGE_SIZE)],
+    }
+
+
+def bench(name, fn):
+    elapsed = min(timeit.repeat(fn, number=REPEAT, repeat=3)) / REPEAT
+    print('{0:<36} {1:10.1f} us'.format(name, elapsed * 1e6))
+
+
+def main():
+    server = stub.serve()
+    helper = QueryForObjects(stub.api(server).data.application('bench'))
+    page_response = response(page())
+    object_response = response(page()['results'][0])
+
+    for decoder in sorted(codec.DECODERS):
+        codec.set_json_decoder(decoder)
+        bench('query page of {0} ({1})'.format(PAGE_SIZE, decoder),
+              lambda: list(rs.QueryResult(helper, page_response)))
+    codec.set_json_decoder('json')
+
+    bench('object, status only',
+          lambda: rs.ObjectResult(helper, object_response).status_code)
+    bench('object, decoded',
+          lambda: rs.ObjectResult(helper, object_response)['index'])
+
+    obj = rs.ObjectResult(helper, object_response)
+    bench('_created x100',
+          lambda: [obj._created for _ in range(100)])
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
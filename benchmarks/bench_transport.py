@@ -0,0 +1,60 @@
+'''
+Requests/second of RequestHelper.request against a local stub server,
+comparing a fresh connection per call with the pooled keep-alive transport.
+
+    $ python -m benchmarks.bench_transport
+'''
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import requests
+
+from benchmarks import stub
+from kii.transport import Transport
+
+
+REQUESTS = 1000
+WORKERS = 8
+BUCKET_ID = 'bench_bucket'
+
+
+class PerCallTransport(Transport):
+    '''
+    The behaviour before pooling: requests.request() builds a new Session
+    (and a new TCP connection) for every API call.
+    '''
+    def request(self, method, url, **kwargs):
+        return requests.request(method, url, **kwargs)
+
+
+def run(api, workers):
+    bucket = api.data.application(BUCKET_ID)
+    object_id = bucket.create_an_object({'key': 'value'}).object_id
+
+    def call(_):
+        bucket.retrieve_an_object(object_id)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        list(executor.map(call, range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+
+    api.close()
+    return REQUESTS / elapsed
+
+
+def main():
+    server = stub.serve()
+
+    for workers in (1, WORKERS):
+        per_call = run(stub.api(server, transport=PerCallTransport()), workers)
+        pooled = run(stub.api(server, pool_maxsize=WORKERS), workers)
+        print('workers={0:<2} per-call: {1:8.1f} req/s  pooled: {2:8.1f} req/s  ({3:.2f}x)'.format(
+            workers, per_call, pooled, pooled / per_call))
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,402 @@
+'''
+In-memory stand-in for the Kii Cloud object REST API.
+
+It implements just enough of the bucket endpoints (objects, query, bodies)
+to drive the benchmarks against localhost without network noise.
+'''
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import multiprocessing
+import re
+import threading
+import time
+import uuid
+
+from kii import KiiAPI
+
+
+BUCKET = re.compile(r'^/api/apps/[^/]+/(?:.+/)?buckets/(?P<bucket>[^/]+)$')
+OBJECTS = re.compile(r'^/api/apps/[^/]+/(?:.+/)?buckets/(?P<bucket>[^/]+)/objects$')
+OBJECT = re.compile(r'^/api/apps/[^/]+/(?:.+/)?buckets/(?P<bucket>[^/]+)/objects/(?P<id>[^/]+)$')
+BODY = re.compile(r'^/api/apps/[^/]+/(?:.+/)?buckets/(?P<bucket>[^/]+)/objects/(?P<id>[^/]+)/body$')
+UPLOADS = re.compile(r'^/api/apps/[^/]+/(?:.+/)?buckets/(?P<bucket>[^/]+)/objects/(?P<id>[^/]+)/body/uploads(?P<rest>/.*)?$')  # NOQA
+QUERY = re.compile(r'^/api/apps/[^/]+/(?:.+/)?buckets/(?P<bucket>[^/]+)/query$')
+
+
+def match(clause, obj):
+    kind = clause['type']
+    if kind == 'all':
+        return True
+    if kind == 'and':
+        return all(match(c, obj) for c in clause['clauses'])
+    if kind == 'or':
+        return any(match(c, obj) for c in clause['clauses'])
+    if kind == 'not':
+        return not match(clause['clause'], obj)
+
+    if clause['field'] not in obj:
+        return False
+    value = obj[clause['field']]
+
+    if kind == 'eq':
+        return value == clause['value']
+    if kind == 'in':
+        return value in clause['values']
+    if kind == 'hasField':
+        types = {'STRING': (str,), 'INTEGER': (int,), 'DECIMAL': (int, float),
+                 'BOOLEAN': (bool,)}[clause['fieldType']]
+        if isinstance(value, bool):
+            return clause['fieldType'] == 'BOOLEAN'
+        return isinstance(value, types)
+    if kind == 'prefix':
+        return str(value).startswith(clause['prefix'])
+    if kind == 'range':
+        limits = [clause[k] for k in ('lowerLimit', 'upperLimit') if k in clause]
+        if any(isinstance(value, str) != isinstance(limit, str) for limit in limits):
+            return False
+        if 'lowerLimit' in clause:
+            if value < clause['lowerLimit']:
+                return False
+            if value == clause['lowerLimit'] and not clause.get('lowerIncluded', True):
+                return False
+        if 'upperLimit' in clause:
+            if value > clause['upperLimit']:
+                return False
+            if value == clause['upperLimit'] and not clause.get('upperIncluded', True):
+                return False
+        return True
+    raise ValueError(kind)
+
+
+class Store:
+    def __init__(self, *, page_size=200, latency=0, throttle=None):
+        self.page_size = page_size
+        self.latency = latency
+        self.throttle = throttle
+        self.allowance = throttle or 0
+        self.checked = time.monotonic()
+        self.throttled = 0
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.bodies = {}
+        self.uploads = {}
+        self.clock = itertools.count(int(time.time() * 1000))
+        self.requests = 0
+        self.faults = []
+
+    def bucket(self, name):
+        return self.buckets.setdefault(name, {})
+
+    def put(self, bucket, object_id, data):
+        with self.lock:
+            objects = self.bucket(bucket)
+            now = next(self.clock)
+            old = objects.get(object_id)
+            obj = dict(data)
+            obj['_id'] = object_id
+            obj['_created'] = old['_created'] if old else now
+            obj['_modified'] = now
+            obj['_version'] = str(int(old['_version']) + 1) if old else '1'
+            obj['_owner'] = 'stub-user'
+            objects[object_id] = obj
+            return obj
+
+    def admit(self):
+        '''
+        server-side token bucket of `throttle` requests/second
+        '''
+        if not self.throttle:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.allowance + (now - self.checked) * self.throttle,
+                                 self.throttle)
+            self.checked = now
+            if self.allowance < 1:
+                self.throttled += 1
+                return False
+            self.allowance -= 1
+            return True
+
+    def fill(self, bucket, count, factory=None):
+        for i in range(count):
+            data = factory(i) if factory else {'index': i, 'even': i % 2 == 0}
+            self.put(bucket, str(uuid.uuid4()), data)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def reply(self, status, body=None, content_type='application/json', headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode('utf-8')
+        body = body or b''
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def error(self, status, code):
+        self.reply(status, {'errorCode': code, 'message': code},
+                   content_type='application/vnd.kii.{0}+json'.format(code))
+
+    def read_body(self):
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+                if size == 0:
+                    return b''.join(chunks)
+
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length)
+
+    def route(self):
+        self.store.requests += 1
+        if self.store.latency:
+            time.sleep(self.store.latency)
+
+        path = self.path.split('?')[0]
+        method = self.headers.get('X-HTTP-Method-Override', self.command)
+        payload = self.read_body()
+
+        if self.store.faults:
+            # injected transient failures: (status, Retry-After or None)
+            status, retry_after = self.store.faults.pop(0)
+            return self.reply(status, {'errorCode': 'UNAVAILABLE', 'message': 'injected'},
+                              headers={'Retry-After': retry_after} if retry_after else None)
+
+        if not self.store.admit():
+            return self.error(429, 'TOO_MANY_REQUESTS')
+
+        m = QUERY.match(path)
+        if m and method == 'POST':
+            return self.query(m.group('bucket'), json.loads(payload.decode('utf-8')))
+
+        m = BUCKET.match(path)
+        if m and method == 'DELETE':
+            with self.store.lock:
+                found = self.store.buckets.pop(m.group('bucket'), None)
+            if found is None:
+                return self.error(404, 'BUCKET_NOT_FOUND')
+            return self.reply(204)
+
+        m = OBJECTS.match(path)
+        if m and method == 'POST':
+            object_id = str(uuid.uuid4())
+            obj = self.store.put(m.group('bucket'), object_id, json.loads(payload.decode('utf-8')))
+            return self.reply(201, {'objectID': object_id,
+                                    'createdAt': obj['_created'],
+                                    'dataType': 'application/json'})
+
+        m = UPLOADS.match(path)
+        if m:
+            return self.upload(m.group('bucket'), m.group('id'), m.group('rest') or '', payload)
+
+        m = BODY.match(path)
+        if m:
+            return self.body(m.group('bucket'), m.group('id'), method, payload)
+
+        m = OBJECT.match(path)
+        if m:
+            return self.object(m.group('bucket'), m.group('id'), method, payload)
+
+        self.error(404, 'NOT_FOUND')
+
+    def object(self, bucket, object_id, method, payload):
+        objects = self.store.bucket(bucket)
+        obj = objects.get(object_id)
+
+        if method == 'GET':
+            if obj is None:
+                return self.error(404, 'OBJECT_NOT_FOUND')
+            if self.headers.get('If-None-Match') == obj['_version']:
+                return self.reply(304, headers={'ETag': obj['_version']})
+            return self.reply(200, obj, headers={'ETag': obj['_version']})
+
+        if method in ('PUT', 'PATCH'):
+            if_match = self.headers.get('If-Match')
+            if if_match and (obj is None or if_match != obj['_version']):
+                return self.error(409, 'OBJECT_VERSION_IS_STALE')
+            data = json.loads(payload.decode('utf-8'))
+            if method == 'PATCH':
+                if obj is None:
+                    return self.error(404, 'OBJECT_NOT_FOUND')
+                merged = dict(obj)
+                merged.update(data)
+                data = merged
+            new = self.store.put(bucket, object_id, data)
+            return self.reply(201 if obj is None else 200,
+                              {'createdAt': new['_created'], 'modifiedAt': new['_modified']},
+                              headers={'ETag': new['_version']})
+
+        if method == 'DELETE':
+            if obj is None:
+                return self.error(404, 'OBJECT_NOT_FOUND')
+            if_match = self.headers.get('If-Match')
+            if if_match and if_match != obj['_version']:
+                return self.error(409, 'OBJECT_VERSION_IS_STALE')
+            with self.store.lock:
+                del objects[object_id]
+            return self.reply(204)
+
+        self.error(405, 'METHOD_NOT_ALLOWED')
+
+    def body(self, bucket, object_id, method, payload):
+        key = (bucket, object_id)
+        if method == 'PUT':
+            self.store.bodies[key] = payload
+            return self.reply(200, {'modifiedAt': next(self.store.clock)})
+
+        body = self.store.bodies.get(key)
+        if body is None:
+            return self.error(404, 'OBJECT_BODY_NOT_FOUND')
+
+        if method == 'DELETE':
+            del self.store.bodies[key]
+            return self.reply(204)
+
+        if method == 'HEAD':
+            return self.reply(200, body, content_type='application/octet-stream')
+
+        requested = self.headers.get('Range')
+        if requested:
+            begin, end = requested.split('=')[1].split('-')
+            begin, end = int(begin), min(int(end), len(body) - 1)
+            if begin >= len(body):
+                return self.error(416, 'OBJECT_BODY_RANGE_NOT_SATISFIABLE')
+            return self.reply(206, body[begin:end + 1],
+                              content_type='application/octet-stream',
+                              headers={'Content-Range': 'bytes {0}-{1}/{2}'.format(
+                                  begin, end, len(body))})
+        self.reply(200, body, content_type='application/octet-stream')
+
+    def upload(self, bucket, object_id, rest, payload):
+        key = (bucket, object_id)
+        if rest == '':
+            upload_id = str(uuid.uuid4())
+            self.store.uploads[upload_id] = {}
+            return self.reply(200, {'uploadID': upload_id})
+
+        upload_id = rest.split('/')[1]
+        pieces = self.store.uploads.get(upload_id)
+        if pieces is None:
+            return self.error(404, 'OBJECT_BODY_UPLOAD_NOT_FOUND')
+
+        if rest.endswith('/data'):
+            begin = int(self.headers['Content-Range'].split('=')[1].split('-')[0])
+            pieces[begin] = payload
+            return self.reply(204)
+
+        if rest.endswith('/status/committed'):
+            self.store.bodies[key] = b''.join(pieces[k] for k in sorted(pieces))
+            del self.store.uploads[upload_id]
+            return self.reply(204)
+
+        if rest.endswith('/status/cancelled'):
+            del self.store.uploads[upload_id]
+            return self.reply(204)
+
+        self.reply(200)
+
+    def query(self, bucket, payload):
+        bucket_query = payload.get('bucketQuery', {})
+        with self.store.lock:
+            objects = list(self.store.bucket(bucket).values())
+
+        hits = [o for o in objects if match(bucket_query.get('clause', {'type': 'all'}), o)]
+
+        aggregations = bucket_query.get('aggregations')
+        if aggregations:
+            name = aggregations[0]['putAggregationInto']
+            return self.reply(200, {'aggregations': {name: len(hits)}})
+
+        order_by = bucket_query.get('orderBy')
+        if order_by:
+            hits.sort(key=lambda o: (order_by not in o, o.get(order_by)),
+                      reverse=bucket_query.get('descending', False))
+        else:
+            hits.sort(key=lambda o: o['_created'])
+
+        start = int(payload.get('paginationKey') or 0)
+        size = min(payload.get('bestEffortLimit') or self.store.page_size,
+                   self.store.page_size)
+        page = hits[start:start + size]
+
+        result = {'queryDescription': 'stub', 'results': page}
+        if start + size < len(hits):
+            result['nextPaginationKey'] = str(start + size)
+        self.reply(200, result)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = route
+
+
+class StubEndpointMixin:
+    server = None
+
+    @property
+    def endpoint_url(self):
+        return 'http://127.0.0.1:{0}/api'.format(self.server.server_port)
+
+
+def serve(**kwargs):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.store = Store(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+class RemoteServer:
+    '''
+    Handle on a stub server running in a child process, so that memory
+    benchmarks only trace the client.
+    '''
+    def __init__(self, process, server_port):
+        self.process = process
+        self.server_port = server_port
+
+    def shutdown(self):
+        self.process.terminate()
+        self.process.join()
+
+    def server_close(self):
+        pass
+
+
+def spawn(setup=None, **kwargs):
+    context = multiprocessing.get_context('fork')
+    parent, child = context.Pipe()
+
+    def run():
+        server = serve(**kwargs)
+        if setup is not None:
+            setup(server.store)
+        child.send(server.server_port)
+        threading.Event().wait()
+
+    process = context.Process(target=run, daemon=True)
+    process.start()
+    return RemoteServer(process, parent.recv())
+
+
+def api(server, cls=KiiAPI, **kwargs):
+    kwargs.setdefault('access_token', 'stub-token')
+    stub_cls = type('Stub' + cls.__name__, (StubEndpointMixin, cls), {'server': server})
+    return stub_cls('stub-app', 'stub-key', **kwargs)
@@ -1,4 +1,7 @@
 # package
-from kii.api import KiiAPI, KiiAdminAPI, Site  # NOQA
+from kii.api import AsyncKiiAPI, KiiAPI, KiiAdminAPI, Site  # NOQA
+from kii.codec import set_json_decoder  # NOQA
 from kii.data import *  # NOQA
+from kii.ratelimit import RateLimiter  # NOQA
+from kii.retry import RetryPolicy  # NOQA
 from kii.users import AccountType  # NOQA
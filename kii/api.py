@@ -7,6 +7,12 @@ from kii.acl import AclManagement
 from kii.data import DataManagement
 from kii.enums import Site
 from kii.groups import GroupManagement
+from kii.transport import (
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    AsyncTransport,
+    Transport,
+)
 from kii.users import RequestANewToken, UserManagement
 
 
@@ -18,25 +24,61 @@ DEFAULT_REGION = Site.US
 
 
 class KiiAPI:
+    transport_class = Transport
+
     def __init__(self,
                  app_id,
                  app_key,
                  *,
                  token_type=None,
                  access_token=None,
-                 region=DEFAULT_REGION):
+                 region=DEFAULT_REGION,
+                 transport=None,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 pool_block=False,
+                 keep_alive=True,
+                 retry=None,
+                 rate_limiter=None):
+        '''
+        transport: A Transport shared with other KiiAPI objects.
+                   When omitted, a new connection pool is built from
+                   pool_connections, pool_maxsize, pool_block and keep_alive.
+        pool_maxsize: Connections kept alive per host. Set it to at least the
+                      concurrency (or partitions) of bulk methods and parallel_scan.
+                      Requests beyond it open a throwaway connection,
+                      or wait for a free one with pool_block.
+        retry: A RetryPolicy for transient errors (429, 5xx, connection errors).
+               Requests are not retried when omitted.
+        rate_limiter: A RateLimiter consulted before every request.
+        '''
         self.app_id = app_id
         self.app_key = app_key
         self.token_type = token_type
         self.access_token = access_token
         self.region = region
 
+        if transport is None:
+            transport = self.transport_class(pool_connections=pool_connections,
+                                             pool_maxsize=pool_maxsize,
+                                             pool_block=pool_block,
+                                             keep_alive=keep_alive)
+        self.transport = transport
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+
         self.user = UserManagement(self)
         self.group = GroupManagement(self)
         self.data = DataManagement(self)
 
         self.acl = AclManagement(self)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     @property
     def users(self):
         warnings.warn('users property deprecates in the near future. Use user property.',
@@ -92,14 +134,56 @@ class KiiAPI:
             self.token_type = token_type
         return self
 
+    def close(self):
+        '''
+        Release pooled connections. Clones share the same transport.
+        '''
+        self.transport.close()
+
     def clone(self, **kwargs):
         base = {
             'token_type': self.token_type,
             'access_token': self.access_token,
             'region': self.region,
+            'transport': self.transport,
+            'retry': self.retry,
+            'rate_limiter': self.rate_limiter,
         }
         base.update(kwargs)
-        return KiiAPI(self.app_id, self.app_key, **base)
+        return self.__class__(self.app_id, self.app_key, **base)
+
+
+class AsyncKiiAPI(KiiAPI):
+    '''
+    asyncio version of KiiAPI.
+    Every API method returns an awaitable and query results support "async for".
+
+        >>> async with AsyncKiiAPI(app_id, app_key, access_token=token) as api:
+        ...     obj = await api.data.application('bucket').create_an_object({'key': 'value'})
+        ...     async for item in await api.data.application('bucket').query().all():
+        ...         print(item)
+
+    pool_block cannot be False. see AsyncTransport.
+    '''
+    transport_class = AsyncTransport
+
+    def __init__(self, app_id, app_key, *, pool_block=True, **kwargs):
+        super().__init__(app_id, app_key, pool_block=pool_block, **kwargs)
+
+    def __enter__(self):
+        raise TypeError('AsyncKiiAPI is closed asynchronously. Use "async with" instead.')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        raise TypeError('AsyncKiiAPI is closed asynchronously. Use "async with" instead.')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        await self.transport.close()
 
 
 class KiiAdminAPI(KiiAPI):
@@ -128,6 +212,9 @@ class KiiAdminAPI(KiiAPI):
             'token_type': self.token_type,
             'access_token': self.access_token,
             'region': self.region,
+            'transport': self.transport,
+            'retry': self.retry,
+            'rate_limiter': self.rate_limiter,
         }
         base.update(kwargs)
         return KiiAdminAPI(self.app_id, self.app_key,
@@ -0,0 +1,149 @@
+import gzip
+import io
+import json
+import os
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+from kii import codec
+from kii.utils import save_json
+
+
+COMPRESSIONS = (None, 'gzip', 'zstd')
+
+SUFFIXES = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+}
+
+# fields assigned by Kii Cloud, which are not sent back when an object is restored
+SERVER_FIELDS = ('_id', '_created', '_modified', '_version', '_owner')
+
+
+def detect_compression(path, compression=None):
+    """
+    compression of an archive. inferred from the suffix of path when None.
+    """
+    if compression is None:
+        compression = SUFFIXES.get(os.path.splitext(os.fspath(path))[1].lower())
+
+    if compression not in COMPRESSIONS:
+        raise ValueError('{0} is not supported. choose from gzip or zstd'.format(compression))
+
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError('zstd needs the zstandard package')
+
+    return compression
+
+
+def dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class ArchiveWriter:
+    """
+    Newline-delimited JSON archive written page by page.
+
+    Each page is appended as a complete gzip member or zstd frame,
+    so the archive can be cut back to the end of any page (offset)
+    and appended to again when an export is resumed.
+    """
+    def __init__(self, path, compression=None, offset=None):
+        self.compression = detect_compression(path, compression)
+        if offset is not None and os.path.exists(path):
+            self.fp = open(path, 'r+b')
+            self.fp.seek(offset)
+            self.fp.truncate()
+        else:
+            self.fp = open(path, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_page(self, objects):
+        """
+        append objects and return the offset of the end of the page
+        """
+        data = b''.join(dumps(obj) + b'\n' for obj in objects)
+        if data:
+            if self.compression == 'gzip':
+                data = gzip.compress(data)
+            elif self.compression == 'zstd':
+                data = zstandard.ZstdCompressor().compress(data)
+            self.fp.write(data)
+            self.fp.flush()
+        return self.fp.tell()
+
+    def close(self):
+        self.fp.close()
+
+
+def read_archive(path, compression=None):
+    """
+    yield the objects of an archive one by one
+    """
+    compression = detect_compression(path, compression)
+    with open(path, 'rb') as raw:
+        if compression == 'gzip':
+            fp = gzip.GzipFile(fileobj=raw)
+        elif compression == 'zstd':
+            fp = io.BufferedReader(
+                zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True))
+        else:
+            fp = raw
+
+        with fp:
+            for line in fp:
+                if line.strip():
+                    yield codec.loads(line)
+
+
+class ExportState:
+    """
+    Where an export stopped, saved next to the archive after every page.
+
+    pagination_key: The key of the next page to export
+    offset: The size of the archive up to the last exported page
+    exported: The number of objects exported so far
+    """
+    def __init__(self, path):
+        self.path = os.fspath(path) + '.state'
+        self.pagination_key = None
+        self.offset = None
+        self.exported = 0
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+
+        self.pagination_key = state['paginationKey']
+        self.offset = state['offset']
+        self.exported = state['exported']
+        return True
+
+    def save(self, pagination_key, offset, exported):
+        self.pagination_key = pagination_key
+        self.offset = offset
+        self.exported = exported
+        save_json(self.path, {
+            'paginationKey': pagination_key,
+            'offset': offset,
+            'exported': exported,
+        })
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
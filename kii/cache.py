@@ -0,0 +1,141 @@
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache whose entries become stale after ttl seconds.
+
+    maxsize: The maximum number of entries
+    ttl: Seconds an entry stays fresh. None keeps entries fresh until evicted.
+    """
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key):
+        """
+        (value, fresh) of the entry or None. Stale entries are kept for revalidation.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            value, stored_at = entry
+            fresh = self.ttl is None or time.monotonic() - stored_at < self.ttl
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value, fresh
+
+    def get(self, key, default=None):
+        """
+        the value of a fresh entry
+        """
+        found = self.lookup(key)
+        if found is None or not found[1]:
+            return default
+        return found[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def touch(self, key):
+        """
+        make an entry fresh again
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], time.monotonic())
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class ObjectCache(LRUCache):
+    """
+    Cache of RetrieveAnObject results keyed by object url.
+
+    Fresh entries are returned without a request. Stale entries are
+    revalidated with their _version as If-None-Match, so an unchanged
+    object costs a 304 instead of its payload.
+    Entries are only served to the access token which fetched them.
+    """
+    def __init__(self, maxsize=1024, ttl=60):
+        super().__init__(maxsize, ttl)
+        self.revalidations = 0
+
+    def revalidated(self, key):
+        self.touch(key)
+        with self._lock:
+            self.revalidations += 1
+
+    def stats(self):
+        stats = super().stats()
+        stats['revalidations'] = self.revalidations
+        return stats
+
+
+class QueryCache(LRUCache):
+    """
+    Cache of query responses keyed by bucket, access token and the JSON
+    of the query request, so every page of a repeated query is served locally.
+
+    A write through a scope sharing the cache bumps the generation of its
+    bucket. Entries of older generations are never looked up again and
+    are evicted as least recently used.
+    """
+    def __init__(self, maxsize=256, ttl=30):
+        super().__init__(maxsize, ttl)
+        self._generations = {}
+
+    def key(self, bucket_url, access_token, query):
+        """
+        query: The query request as a dict, or its body as bytes
+        """
+        if not isinstance(query, bytes):
+            query = json.dumps(query, sort_keys=True, separators=(',', ':'),
+                               ensure_ascii=False, default=str).encode('utf-8')
+        digest = hashlib.sha1(query).hexdigest()
+        with self._lock:
+            generation = self._generations.get(bucket_url, 0)
+        return bucket_url, generation, access_token, digest
+
+    def invalidate_bucket(self, bucket_url):
+        with self._lock:
+            self._generations[bucket_url] = self._generations.get(bucket_url, 0) + 1
@@ -0,0 +1,45 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+DECODERS = {
+    'json': json.loads,
+}
+if orjson is not None:
+    DECODERS['orjson'] = orjson.loads
+
+_loads = json.loads
+
+
+def loads(content):
+    """
+    decode a response body (bytes) with the configured JSON decoder
+    """
+    return _loads(content)
+
+
+def set_json_decoder(decoder='auto'):
+    """
+    Choose the function decoding JSON response bodies.
+
+    decoder: 'json' (the standard library, default), 'orjson',
+             'auto' (orjson when it is installed) or a callable taking bytes
+    """
+    global _loads
+
+    if callable(decoder):
+        _loads = decoder
+        return
+
+    if decoder == 'auto':
+        decoder = 'orjson' if 'orjson' in DECODERS else 'json'
+
+    try:
+        _loads = DECODERS[decoder]
+    except KeyError as e:
+        raise ValueError('{0} is not available. choose from {1}'.format(
+            decoder, ', '.join(sorted(DECODERS)))) from e
@@ -1,6 +1,19 @@
+from contextlib import contextmanager
+import copy
 from enum import Enum, unique
-
-from kii import exceptions as exc
+import logging
+import os
+import threading
+
+from kii import exceptions as exc, results as rs
+from kii.archive import (
+    SERVER_FIELDS,
+    ArchiveWriter,
+    ExportState,
+    detect_compression,
+    read_archive,
+)
+from kii.cache import ObjectCache, QueryCache
 from kii.data import (
     application as ApplicationScopeBucket,
     group as GroupScopeBucket,
@@ -9,7 +22,18 @@ from kii.data import (
 )
 from kii.enums import UserRequestType
 from kii.users import AccountTypeMixin
-from kii.utils import Accessor
+from kii.utils import (
+    Accessor,
+    abounded_imap,
+    abounded_map,
+    ainterleave,
+    body_view,
+    bounded_map,
+    interleave,
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 RESERVED_WORDS = ('users', 'devices', 'internal', 'things')
@@ -28,6 +52,9 @@ class DataManagement:
 
 
 class Scope:
+    object_cache = None
+    query_cache = None
+
     def request(self, cls, *args, **kwargs):
         helper = cls(self, *args, **kwargs)
         if not helper.bucket_id:
@@ -35,34 +62,283 @@ class Scope:
 
         return helper.request()
 
+    def enable_object_cache(self, maxsize=1024, ttl=60):
+        """
+        Cache the results of retrieve_an_object on this scope and on the buckets
+        created from it afterwards.
+
+        maxsize: The maximum number of cached objects (least recently used are evicted)
+        ttl: Seconds a cached object is returned without asking the server.
+             After that it is revalidated with If-None-Match.
+        """
+        self.object_cache = ObjectCache(maxsize, ttl)
+        return self
+
+    def disable_object_cache(self):
+        self.object_cache = None
+        return self
+
+    def enable_query_cache(self, maxsize=256, ttl=30):
+        """
+        Cache the responses of queries on this scope and on the buckets
+        created from it afterwards. Writes through these scopes invalidate
+        the queries of the written bucket.
+
+        maxsize: The maximum number of cached pages (least recently used are evicted)
+        ttl: Seconds a cached page is used
+        """
+        self.query_cache = QueryCache(maxsize, ttl)
+        return self
+
+    def disable_query_cache(self):
+        self.query_cache = None
+        return self
+
+    def _bind(self, scope):
+        """
+        share the caches with a scope created from this one
+        """
+        scope.object_cache = self.object_cache
+        scope.query_cache = self.query_cache
+        return scope
+
+    def _object_key(self, object_id):
+        return self.scope.RetrieveAnObject(self, object_id).url
+
+    def _invalidate(self, object_id=None):
+        # a scope without these helpers has nothing of its own in the caches
+        if object_id is not None and self.object_cache is not None and \
+                self.scope.implements('RetrieveAnObject'):
+            self.object_cache.invalidate(self._object_key(object_id))
+
+        if self.query_cache is not None and self.scope.implements('QueryForObjects'):
+            self.query_cache.invalidate_bucket(self.scope.QueryForObjects(self).url)
+
+    def _invalidate_bucket(self, bucket):
+        """
+        drop the caches of a deleted bucket
+        """
+        if self.object_cache is not None:
+            self.object_cache.clear()
+        bucket._invalidate()
+
+    def _write(self, object_id, cls, *args, **kwargs):
+        """
+        request a write and drop what it may change from the caches.
+        object_id is None when the write creates an object.
+        """
+        if self.object_cache is None and self.query_cache is None:
+            return self.request(cls, *args, **kwargs)
+
+        self._invalidate(object_id)
+        if self.api.transport.is_async:
+            return self._write_async(object_id, cls, *args, **kwargs)
+
+        try:
+            return self.request(cls, *args, **kwargs)
+        finally:
+            # a read racing with the write may have cached the old state
+            self._invalidate(object_id)
+
+    async def _write_async(self, object_id, cls, *args, **kwargs):
+        try:
+            return await self.request(cls, *args, **kwargs)
+        finally:
+            self._invalidate(object_id)
+
     def create_an_object(self, params):
-        return self.request(self.scope.CreateAnObject, params)
+        return self._write(None, self.scope.CreateAnObject, params)
+
+    def create_objects(self, params, *, concurrency=1, keep_results=True, progress=None):
+        """
+        Create an object for each item of params.
+
+        params: An iterable (or an async iterable with AsyncKiiAPI) of object data.
+                It is consumed lazily, so it may be a generator of any length.
+        concurrency: The number of objects created at the same time.
+                     see pool_maxsize of KiiAPI.
+        keep_results: Keep a CreateResult per item in BulkResult.results.
+                      Disable it for very large batches.
+        progress: Called with the BulkResult after each item
+
+        A failed item does not stop the batch. It is reported in BulkResult.errors.
+        """
+        return self._bulk(self.create_an_object, params, concurrency,
+                          keep_results=keep_results, progress=progress)
+
+    def _bulk(self, fn, items, concurrency, *,
+              summary=None, keep_results=True, progress=None):
+        """
+        call fn for each item with bounded concurrency and collect the outcome in summary
+        """
+        if summary is None:
+            summary = rs.BulkResult(keep_results)
+
+        if self.api.transport.is_async:
+            return self._bulk_async(fn, items, concurrency, summary, progress)
+
+        def call(item):
+            try:
+                return item, fn(item), None
+            except Exception as e:
+                return item, None, e
+
+        for item, result, error in bounded_map(call, items, concurrency):
+            self._bulk_add(summary, item, result, error, progress)
+        return summary
+
+    async def _bulk_async(self, fn, items, concurrency, summary, progress):
+        async def call(item):
+            try:
+                return item, await fn(item), None
+            except Exception as e:
+                return item, None, e
+
+        async for item, result, error in abounded_imap(call, items, concurrency):
+            self._bulk_add(summary, item, result, error, progress)
+        return summary
+
+    @staticmethod
+    def _bulk_add(summary, item, result, error, progress):
+        if error is not None:
+            logger.warning('bulk item %d failed: %s', summary.total, error)
+        summary.add(summary.total, item, result, error)
+        if progress is not None:
+            progress(summary)
 
     def retrieve_an_object(self, object_id):
-        return self.request(self.scope.RetrieveAnObject, object_id)
+        if self.object_cache is None:
+            return self.request(self.scope.RetrieveAnObject, object_id)
+
+        key = self._object_key(object_id)
+        token = self.api.access_token
+        cached = None
+        found = self.object_cache.lookup(key)
+        if found is not None:
+            (owner, result), fresh = found
+            if owner == token:
+                if fresh:
+                    return self._cached_object(result)
+                cached = result
+
+        version = cached['_version'] if cached is not None else None
+        if self.api.transport.is_async:
+            return self._retrieve_an_object_async(object_id, key, token, cached, version)
+
+        try:
+            result = self.request(self.scope.RetrieveAnObject, object_id,
+                                  if_none_match=version)
+        except exc.KiiObjectNotFoundError:
+            self.object_cache.invalidate(key)
+            raise
+        return self._cache_object(key, token, cached, result)
+
+    async def _retrieve_an_object_async(self, object_id, key, token, cached, version):
+        try:
+            result = await self.request(self.scope.RetrieveAnObject, object_id,
+                                        if_none_match=version)
+        except exc.KiiObjectNotFoundError:
+            self.object_cache.invalidate(key)
+            raise
+        return self._cache_object(key, token, cached, result)
+
+    def _cached_object(self, result):
+        if self.api.transport.is_async:
+            async def hit():
+                return self._copy_object(result)
+
+            return hit()
+
+        return self._copy_object(result)
+
+    def _cache_object(self, key, token, cached, result):
+        if result.status_code == 304:
+            self.object_cache.revalidated(key)
+            return self._copy_object(cached)
+
+        self.object_cache.set(key, (token, result))
+        return self._copy_object(result)
+
+    @staticmethod
+    def _copy_object(result):
+        # callers may modify the returned object, so the cached one is never handed out
+        return copy.copy(result).set_result(copy.deepcopy(result._result))
+
+    def retrieve_objects(self, object_ids, *, chunk_size=200, concurrency=1, by_query=True):
+        """
+        Retrieve many objects by id. Returns an ObjectsResult keyed by id
+        whose missing attribute lists the ids which were not found.
+
+        chunk_size: The number of ids in the InClause of each query
+        concurrency: The number of queries (or GETs) sent at the same time
+        by_query: Query chunks of ids with an InClause on _id.
+                  When False, every object is retrieved with its own GET.
+        """
+        object_ids = list(dict.fromkeys(object_ids))
+        if by_query:
+            chunks = [object_ids[i:i + chunk_size]
+                      for i in range(0, len(object_ids), chunk_size)]
+        else:
+            chunks = object_ids
+
+        if self.api.transport.is_async:
+            return self._retrieve_objects_async(object_ids, chunks, concurrency, by_query)
+
+        def fetch(chunk):
+            if by_query:
+                return list(self.query(clauses.InClause('_id', chunk)).stream())
+            try:
+                return [self.retrieve_an_object(chunk)]
+            except exc.KiiObjectNotFoundError:
+                return []
+
+        found = {}
+        for objects in bounded_map(fetch, chunks, concurrency):
+            found.update((obj._id, obj) for obj in objects)
+        return self._objects_result(object_ids, found)
+
+    async def _retrieve_objects_async(self, object_ids, chunks, concurrency, by_query):
+        async def fetch(chunk):
+            if by_query:
+                return [obj async for obj in self.query(clauses.InClause('_id', chunk)).stream()]
+            try:
+                return [await self.retrieve_an_object(chunk)]
+            except exc.KiiObjectNotFoundError:
+                return []
+
+        found = {}
+        for objects in await abounded_map(fetch, chunks, concurrency):
+            found.update((obj._id, obj) for obj in objects)
+        return self._objects_result(object_ids, found)
+
+    @staticmethod
+    def _objects_result(object_ids, found):
+        return rs.ObjectsResult(
+            ((object_id, found[object_id]) for object_id in object_ids if object_id in found),
+            (object_id for object_id in object_ids if object_id not in found))
 
     def fully_update_an_object(self, object_id, data,
                                *, if_match=None, if_none_match=None):
-        return self.request(self.scope.FullyUpdateAnObject, object_id, data,
-                            if_match=if_match,
-                            if_none_match=if_none_match)
+        return self._write(object_id, self.scope.FullyUpdateAnObject, object_id, data,
+                           if_match=if_match,
+                           if_none_match=if_none_match)
 
     def create_a_new_object_with_an_id(self, object_id, data,
                                        *, if_match=None, if_none_match=None):
-        return self.request(self.scope.CreateANewObjectWithAnID, object_id, data,
-                            if_match=if_match,
-                            if_none_match=if_none_match)
+        return self._write(object_id, self.scope.CreateANewObjectWithAnID, object_id, data,
+                           if_match=if_match,
+                           if_none_match=if_none_match)
 
     def partially_update_an_object(self, object_id, data,
                                    *, if_match=None, if_none_match=None):
-        return self.request(self.scope.PartiallyUpdateAnObject, object_id, data,
-                            if_match=if_match,
-                            if_none_match=if_none_match)
+        return self._write(object_id, self.scope.PartiallyUpdateAnObject, object_id, data,
+                           if_match=if_match,
+                           if_none_match=if_none_match)
 
     def delete_an_object(self, object_id, *, if_match=None, if_none_match=None):
-        return self.request(self.scope.DeleteAnObject, object_id,
-                            if_match=if_match,
-                            if_none_match=if_none_match)
+        return self._write(object_id, self.scope.DeleteAnObject, object_id,
+                           if_match=if_match,
+                           if_none_match=if_none_match)
 
     def query_for_objects(self, clause=None, **kwargs):
         return self.request(self.scope.QueryForObjects, clause, **kwargs)
@@ -81,10 +357,281 @@ class Scope:
 
         return self.scope.QueryForObjects(self, clause)
 
+    def count_many(self, named, *, concurrency=4):
+        """
+        Count the objects matching each clause at the same time.
+
+        named: {name: clause}. None counts every object.
+        concurrency: The number of counts requested at the same time
+
+        Returns {name: count}.
+        """
+        names = list(named)
+
+        if self.api.transport.is_async:
+            return self._count_many_async(named, names, concurrency)
+
+        def count(name):
+            return self.query(named[name]).count()
+
+        return dict(zip(names, bounded_map(count, names, concurrency)))
+
+    async def _count_many_async(self, named, names, concurrency):
+        async def count(name):
+            return await self.query(named[name]).count()
+
+        return dict(zip(names, await abounded_map(count, names, concurrency)))
+
+    def parallel_scan(self, partitions=4, key='_created', *, query=None, bounds=None):
+        """
+        Scan the bucket with one query per range of key, all paginated at the
+        same time, and yield the objects as their pages arrive (in no particular order).
+
+        partitions: The number of disjoint RangeClause partitions scanned at the same time.
+                    see pool_maxsize of KiiAPI.
+        key: The numeric field to split on. _created splits the bucket into time windows.
+             Objects without a number in key are not scanned.
+        query: A query of this bucket whose clause and item type (as_records, as_dicts)
+               are used. Its order, offset and limit are not applied.
+        bounds: (lowest, highest) values of key to scan.
+                Found with two single-object queries over the objects
+                which have a number in key when None.
+        """
+        query = (query or self.query()).clone()
+        query._offset, query._limit = 0, None
+
+        if self.api.transport.is_async:
+            return self._parallel_scan_async(query, partitions, key, bounds)
+
+        return self._parallel_scan(query, partitions, key, bounds)
+
+    def _parallel_scan(self, query, partitions, key, bounds):
+        if bounds is None:
+            numbers = query.filter(numeric_clause(key))
+            lowest = numbers.clone().order_by(key, False).first()
+            highest = numbers.clone().order_by(key, True).first()
+            if lowest is None or highest is None:
+                return
+            bounds = scan_bound(lowest, key), scan_bound(highest, key)
+
+        def scan(partition):
+            yield from partition.iter_pages()
+
+        partitions = [query.filter(clause) for clause in partition_clauses(key, *bounds,
+                                                                           partitions)]
+        for page in interleave([scan(partition) for partition in partitions], len(partitions)):
+            yield from page
+
+    async def _parallel_scan_async(self, query, partitions, key, bounds):
+        if bounds is None:
+            numbers = query.filter(numeric_clause(key))
+            lowest = await numbers.clone().order_by(key, False).first()
+            highest = await numbers.clone().order_by(key, True).first()
+            if lowest is None or highest is None:
+                return
+            bounds = scan_bound(lowest, key), scan_bound(highest, key)
+
+        partitions = [query.filter(clause) for clause in partition_clauses(key, *bounds,
+                                                                           partitions)]
+        async for page in ainterleave([partition.iter_pages() for partition in partitions],
+                                      len(partitions)):
+            for item in page:
+                yield item
+
+    def export(self, path, query=None, *, compression=None, resume=True, progress=None):
+        """
+        Write the objects of the bucket to path as newline-delimited JSON.
+        Objects are fetched and written page by page, so memory use does not
+        grow with the bucket size. Returns the number of exported objects.
+
+        query: A query of this bucket selecting the objects. All objects when None.
+               Its offset and limit are not applied.
+        compression: None, 'gzip' or 'zstd' (needs zstandard).
+                     Inferred from the suffix of path (.gz, .zst) when None.
+        resume: Continue an export which stopped before its end from the
+                pagination key saved in path + '.state' after every page.
+                The state file is removed when the export finishes.
+        progress: Called with the number of exported objects after each page
+        """
+        state = ExportState(path)
+        if not (resume and state.load() and os.path.exists(path)):
+            state = ExportState(path)
+
+        helper = (query or self.query()).clone().as_dicts()
+        helper._offset, helper._limit = 0, None
+        helper.pagination_key(state.pagination_key)
+
+        if self.api.transport.is_async:
+            return self._export_async(path, helper, compression, state, progress)
+
+        with ArchiveWriter(path, compression, state.offset) as archive:
+            if state.offset is None or state.pagination_key is not None:
+                for page in helper.request()._pages():
+                    self._export_page(archive, page, state, progress)
+
+        state.remove()
+        return state.exported
+
+    async def _export_async(self, path, helper, compression, state, progress):
+        with ArchiveWriter(path, compression, state.offset) as archive:
+            if state.offset is None or state.pagination_key is not None:
+                async for page in (await helper.request())._apages():
+                    self._export_page(archive, page, state, progress)
+
+        state.remove()
+        return state.exported
+
+    @staticmethod
+    def _export_page(archive, page, state, progress):
+        offset = archive.write_page(page._items)
+        state.save(page.next_pagination_key, offset, state.exported + len(page._items))
+        if progress is not None:
+            progress(state.exported)
+
+    def import_(self, path, *, compression=None, concurrency=1, progress=None):
+        """
+        Restore the objects of an archive written by export with their ids.
+        Objects with the same ids are overwritten, so a failed import
+        can simply be run again. Returns a BulkResult whose items are the objects.
+
+        compression: None, 'gzip' or 'zstd'. Inferred from the suffix of path when None.
+        concurrency: The number of objects restored at the same time
+        progress: Called with the BulkResult after each object
+        """
+        compression = detect_compression(path, compression)
+
+        def restore(obj):
+            data = {key: value for key, value in obj.items() if key not in SERVER_FIELDS}
+            return self.create_a_new_object_with_an_id(obj['_id'], data)
+
+        return self._bulk(restore, read_archive(path, compression), concurrency,
+                          keep_results=False, progress=progress)
+
     def retrieve_an_object_body(self, object_id, *,
-                                if_match=None, range=None):
+                                if_match=None, range=None, stream=False):
         return self.request(self.scope.RetrieveAnObjectBody, object_id,
-                            if_match=if_match, range=range)
+                            if_match=if_match, range=range, stream=stream)
+
+    def download_an_object_body(self, object_id, target, *,
+                                piece_byte=8 * 1024 * 1024,  # 8MB
+                                concurrency=1,
+                                retries=2,
+                                chunk_size=64 * 1024,
+                                ranges=None):
+        """
+        Write an object body to target in chunks instead of holding it in memory.
+        With AsyncKiiAPI a response is read at once, so up to concurrency
+        pieces of piece_byte are held in memory.
+
+        target: A file path or a writable file object.
+                It must be seekable when concurrency is greater than 1.
+        concurrency: The number of byte ranges of piece_byte fetched at the same time
+        retries: The number of times a failed range is resumed from its last written byte
+        ranges: (begin, end) byte ranges to fetch instead of the whole body.
+                Pass KiiIncompleteDownloadError.missing to resume a failed download
+                into the same target.
+
+        Returns the number of written bytes.
+        """
+        if self.api.transport.is_async:
+            return self._download_an_object_body_async(object_id, target, piece_byte,
+                                                       concurrency, retries, ranges)
+
+        with open_download_target(target, resume=ranges is not None) as fp:
+            lock = threading.Lock()
+
+            def fetch(piece):
+                begin, end = piece
+                position = begin
+                for attempt in range(retries + 1):
+                    try:
+                        if position == 0 and end == '':
+                            result = self.retrieve_an_object_body(object_id, stream=True)
+                        else:
+                            result = self.retrieve_an_object_body(object_id,
+                                                                  range=(position, end),
+                                                                  stream=True)
+                        for chunk in result.iter_content(chunk_size):
+                            with lock:
+                                fp.seek(position)
+                                fp.write(chunk)
+                            position += len(chunk)
+                        return position - begin, result.total_size, []
+                    except exc.KiiObjectBodyRangeNotSatisfiableError:
+                        # nothing left to read. e.g.) an empty body
+                        return position - begin, position, []
+                    except Exception:
+                        if attempt >= retries:
+                            logger.exception('failed to download bytes %s-%s of %s',
+                                             position, end, object_id)
+                            return position - begin, None, [(position, end)]
+                        logger.warning('resume downloading bytes %s-%s of %s',
+                                       position, end, object_id)
+
+            if ranges is None:
+                first = (0, '') if concurrency <= 1 else (0, piece_byte - 1)
+                written, total, missing = fetch(first)
+                if missing:
+                    # the size of the body is unknown, so the rest of it is missing too
+                    missing = [(missing[0][0], '')]
+                ranges = [] if missing or total is None else \
+                    download_ranges(written, total, piece_byte)
+            else:
+                written, missing = 0, []
+
+            for size, _, failed in bounded_map(fetch, ranges, concurrency):
+                written += size
+                missing.extend(failed)
+
+        if missing:
+            raise exc.KiiIncompleteDownloadError(missing=missing)
+        return written
+
+    async def _download_an_object_body_async(self, object_id, target, piece_byte,
+                                             concurrency, retries, ranges):
+        # a response is read into memory, so the body is always fetched
+        # in ranges of piece_byte, even with a concurrency of 1
+        with open_download_target(target, resume=ranges is not None) as fp:
+            async def fetch(piece):
+                begin, end = piece
+                for attempt in range(retries + 1):
+                    try:
+                        result = await self.retrieve_an_object_body(object_id,
+                                                                    range=(begin, end))
+                        fp.seek(begin)
+                        fp.write(result.body)
+                        return len(result.body), result.total_size, []
+                    except exc.KiiObjectBodyRangeNotSatisfiableError:
+                        return 0, begin, []
+                    except Exception:
+                        if attempt >= retries:
+                            logger.exception('failed to download bytes %s-%s of %s',
+                                             begin, end, object_id)
+                            return 0, None, [(begin, end)]
+                        logger.warning('retry downloading bytes %s-%s of %s',
+                                       begin, end, object_id)
+
+            written, missing, closed = 0, [], []
+            for begin, end in [(0, '')] if ranges is None else ranges:
+                if end != '':
+                    closed.append((begin, end))
+                    continue
+
+                # the first piece of an open range tells the size of the body
+                size, total, failed = await fetch((begin, begin + piece_byte - 1))
+                written += size
+                if failed:
+                    missing.append((begin, ''))
+                elif total is not None:
+                    closed.extend(download_ranges(begin + size, total, piece_byte))
+
+            for size, _, failed in await abounded_map(fetch, closed, concurrency):
+                written += size
+                missing.extend(failed)
+
+        if missing:
+            raise exc.KiiIncompleteDownloadError(missing=missing)
+        return written
 
     def add_or_replace_an_object_body(self, object_id, body, content_type, *,
                                       if_match=None, if_none_match=None):
@@ -96,12 +643,22 @@ class Scope:
         return self.request(self.scope.VerifyTheObjectBodyExistence, object_id)
 
     def has_body(self, object_id):
+        if self.api.transport.is_async:
+            return self._has_body_async(object_id)
+
         try:
             self.verify_the_object_body_existence(object_id)
             return True
         except exc.KiiObjectBodyNotFoundError:
             return False
 
+    async def _has_body_async(self, object_id):
+        try:
+            await self.verify_the_object_body_existence(object_id)
+            return True
+        except exc.KiiObjectBodyNotFoundError:
+            return False
+
     def delete_an_object_body(self, object_id):
         return self.request(self.scope.DeleteAnObjectBody, object_id)
 
@@ -130,27 +687,67 @@ class Scope:
         return self.request(self.scope.SetTheObjectBodyUploadStatusToCancelled,
                             object_id, upload_id)
 
-    def upload_body_multiple_pieces(self, object_id, body, content_type,
-                                    piece_byte=1024 * 1024):  # 1MB
-        upload_id = self.start_uploading_an_object_body(object_id).upload_id
-        filesize = len(body)
+    @staticmethod
+    def pieces(filesize, piece_byte):
+        """
+        (start, end) byte ranges of each piece. end is inclusive.
+        """
+        start, end = 0, piece_byte
 
-        def upload():
-            start, end = 0, piece_byte
+        while True:
+            # tail
+            if end >= filesize:
+                end = filesize - 1
+
+            yield start, end
 
-            while True:
-                # tail
-                if end >= filesize:
-                    end = filesize - 1
+            if end + 1 >= filesize:
+                break
+
+            start = end + 1
+            end = start + piece_byte
+
+    def upload_body_multiple_pieces(self, object_id, body, content_type,
+                                    piece_byte=1024 * 1024,  # 1MB
+                                    *, concurrency=1, retries=0):
+        """
+        body: bytes, str, os.PathLike, a file object or an iterable of bytes.
+              Files are memory-mapped and iterables are spooled to a temporary
+              file, so only the pieces in flight are held in memory.
+              Every piece carries the total size, so an iterable is read to
+              the end before the first piece is sent.
+        concurrency: The number of pieces uploaded at the same time
+        retries: The number of times a failed piece is uploaded again
+                 before the whole upload is cancelled
+        """
+        if self.api.transport.is_async:
+            return self._upload_body_multiple_pieces_async(object_id, body, content_type,
+                                                           piece_byte, concurrency, retries)
 
-                self.upload_the_given_object_data(object_id, upload_id, body[start:end + 1],
-                                                  content_type, start, end, filesize)
+        with body_view(body) as view:
+            return self._upload_body_view(object_id, view, content_type,
+                                          piece_byte, concurrency, retries)
 
-                if end + 1 >= filesize:
-                    break
+    def _upload_body_view(self, object_id, view, content_type,
+                          piece_byte, concurrency, retries):
+        upload_id = self.start_uploading_an_object_body(object_id).upload_id
+        filesize = len(view)
+
+        def upload_piece(piece):
+            start, end = piece
+            for attempt in range(retries + 1):
+                try:
+                    return self.upload_the_given_object_data(object_id, upload_id,
+                                                             view[start:end + 1], content_type,
+                                                             start, end, filesize)
+                except Exception:
+                    if attempt >= retries:
+                        raise
+                    logger.warning('retry uploading bytes %d-%d of %s', start, end, object_id)
 
-                start = end + 1
-                end = start + piece_byte
+        def upload():
+            for _ in bounded_map(upload_piece, self.pieces(filesize, piece_byte), concurrency):
+                pass
 
             self.set_the_object_body_upload_status_to_committed(object_id, upload_id)
 
@@ -160,6 +757,95 @@ class Scope:
             self.set_the_object_body_upload_status_to_cancelled(object_id, upload_id)
             raise e
 
+    async def _upload_body_multiple_pieces_async(self, object_id, body, content_type,
+                                                 piece_byte, concurrency, retries):
+        with body_view(body) as view:
+            return await self._upload_body_view_async(object_id, view, content_type,
+                                                      piece_byte, concurrency, retries)
+
+    async def _upload_body_view_async(self, object_id, view, content_type,
+                                      piece_byte, concurrency, retries):
+        upload_id = (await self.start_uploading_an_object_body(object_id)).upload_id
+        filesize = len(view)
+
+        async def upload_piece(piece):
+            start, end = piece
+            for attempt in range(retries + 1):
+                try:
+                    return await self.upload_the_given_object_data(object_id, upload_id,
+                                                                   view[start:end + 1],
+                                                                   content_type,
+                                                                   start, end, filesize)
+                except Exception:
+                    if attempt >= retries:
+                        raise
+                    logger.warning('retry uploading bytes %d-%d of %s', start, end, object_id)
+
+        async def upload():
+            await abounded_map(upload_piece, self.pieces(filesize, piece_byte), concurrency)
+            await self.set_the_object_body_upload_status_to_committed(object_id, upload_id)
+
+        try:
+            await upload()
+        except Exception as e:
+            await self.set_the_object_body_upload_status_to_cancelled(object_id, upload_id)
+            raise e
+
+
+def download_ranges(begin, total, piece_byte):
+    """
+    (begin, end) byte ranges of piece_byte covering [begin, total). end is inclusive.
+    """
+    return [(start, min(start + piece_byte, total) - 1)
+            for start in range(begin, total, piece_byte)]
+
+
+def scan_bound(obj, key):
+    value = obj[key] if key in obj else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise exc.KiiInvalidTypeError(
+            '{0} of the first or last object is not a number: {1!r}. '
+            'pass bounds to parallel_scan.'.format(key, value))
+    return value
+
+
+def numeric_clause(key):
+    """
+    clause of the objects which have a number in key
+    """
+    return clauses.OrClause(
+        clauses.HasFieldClause(key, clauses.HasFieldClause.Types.integer),
+        clauses.HasFieldClause(key, clauses.HasFieldClause.Types.decimal))
+
+
+def partition_clauses(key, lowest, highest, partitions):
+    """
+    RangeClause of key for each of up to partitions ranges covering [lowest, highest]
+    """
+    partitions = max(partitions, 1)
+    span = highest - lowest
+    if isinstance(lowest, int) and isinstance(highest, int):
+        limits = [lowest + span * i // partitions for i in range(partitions)]
+    else:
+        limits = [lowest + span * i / partitions for i in range(partitions)]
+    limits = sorted(set(limits))
+
+    upper = limits[1:]
+    return [clauses.RangeClause(key).ge(lower).lt(upper[i]) if i < len(upper)
+            else clauses.RangeClause(key).ge(lower).le(highest)
+            for i, lower in enumerate(limits)]
+
+
+@contextmanager
+def open_download_target(target, resume=False):
+    if not isinstance(target, (str, os.PathLike)):
+        yield target
+        return
+
+    mode = 'r+b' if resume and os.path.exists(target) else 'wb'
+    with open(target, mode) as fp:
+        yield fp
+
 
 class ApplicationScope(Scope):
     def __init__(self, api, scope, bucket_id=None):
@@ -174,7 +860,7 @@ class ApplicationScope(Scope):
         if not bucket_id:
             raise exc.KiiInvalidBucketIdError
 
-        return ApplicationScope(self.api, self.scope, bucket_id)
+        return self._bind(ApplicationScope(self.api, self.scope, bucket_id))
 
     def retrieve_a_bucket(self, bucket_id):
         req = self.scope.RetrieveABucket(self, bucket_id)
@@ -182,6 +868,7 @@ class ApplicationScope(Scope):
         return result
 
     def delete_a_bucket(self, bucket_id):
+        self._invalidate_bucket(self(bucket_id))
         req = self.scope.DeleteABucket(self, bucket_id)
         result = req.request()
         return result
@@ -204,7 +891,7 @@ class GroupScope(ApplicationScope):
         if not bucket_id:
             raise exc.KiiInvalidBucketIdError
 
-        return GroupScope(self.api, self.scope, group_id, bucket_id)
+        return self._bind(GroupScope(self.api, self.scope, group_id, bucket_id))
 
     def retrieve_a_bucket(self, group_id, bucket_id):
         req = self.scope.RetrieveABucket(self, group_id, bucket_id)
@@ -212,6 +899,7 @@ class GroupScope(ApplicationScope):
         return result
 
     def delete_a_bucket(self, group_id, bucket_id):
+        self._invalidate_bucket(self(group_id, bucket_id))
         req = self.scope.DeleteABucket(self, group_id, bucket_id)
         result = req.request()
         return result
@@ -232,8 +920,9 @@ class UserScope(AccountTypeMixin, ApplicationScope):
         if bucket_id in RESERVED_WORDS or bucket_id.startswith('_'):
             raise exc.KiiInvalidBucketIdError
 
-        return UserScope(self.api, self.scope, bucket_id,
-                         account_type=account_type, address=address, user_id=user_id)
+        return self._bind(UserScope(self.api, self.scope, bucket_id,
+                                    account_type=account_type, address=address,
+                                    user_id=user_id))
 
     @property
     def request_type(self):
@@ -269,6 +958,8 @@ class UserScope(AccountTypeMixin, ApplicationScope):
         return result
 
     def delete_a_bucket(self, bucket_id, *, account_type=None, address=None, user_id=None):
+        self._invalidate_bucket(self(bucket_id, account_type=account_type,
+                                     address=address, user_id=user_id))
         req = self.scope.DeleteABucket(self,
                                        bucket_id,
                                        account_type=account_type,
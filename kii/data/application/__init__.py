@@ -1,14 +1,25 @@
 # Application Scope Bucket
 from datetime import datetime
+import heapq
+from itertools import chain
 import json
+import os
 
 from kii import exceptions as exc, results as rs
 from kii.data.clauses import (
     Clause,
     AllClause,
     AndClause,
+    InClause,
+    NotClause,
+    RangeClause,
+    has_field_clause,
+    normalize,
+    split,
 )
 from kii.helpers import BucketsHelper
+from kii.results.page import decode_page_token, encode_page_token
+from kii.utils import abounded_imap, amerge, bounded_map
 
 
 # Manage Buckets
@@ -83,9 +94,10 @@ class RetrieveAnObject(BucketsHelper):
     method = 'GET'
     result_container = rs.ObjectResult
 
-    def __init__(self, scope, object_id):
+    def __init__(self, scope, object_id, *, if_none_match=None):
         super().__init__(scope)
         self.object_id = object_id
+        self.if_none_match = if_none_match
 
     @property
     def api_path(self):
@@ -98,6 +110,10 @@ class RetrieveAnObject(BucketsHelper):
     def headers(self):
         headers = super().headers
         headers['Content-Type'] = 'application/json'
+
+        if self.if_none_match:
+            headers['If-None-Match'] = self.if_none_match
+
         return headers
 
 
@@ -203,6 +219,8 @@ class DeleteAnObject(BucketsHelper):
 class QueryForObjects(BucketsHelper):
     method = 'POST'
     result_container = rs.QueryResult
+    idempotent = True  # a query is safe to retry although it is a POST
+    rate_class = 'query'
 
     def __init__(self, scope,
                  clause=None,
@@ -215,6 +233,7 @@ class QueryForObjects(BucketsHelper):
 
         super().__init__(scope)
         self.internal = False
+        self._compiled = None
 
         if clause is None:
             clause = AllClause()
@@ -226,7 +245,11 @@ class QueryForObjects(BucketsHelper):
         self._best_effort_limit = best_effort_limit
         self._limit = limit
         self._offset = 0
+        self._prefetch = 0
+        self._item_type = 'object'
         self._aggregations = []
+        self._resumed = None
+        self._checkpoint = None
 
     @property
     def api_path(self):
@@ -250,6 +273,7 @@ class QueryForObjects(BucketsHelper):
             raise exc.KiiInvalidClauseError
 
         self._clause = clause
+        self._compiled = None
 
     def clone(self):
         instance = self.__class__(self.scope, self.clause)
@@ -259,20 +283,60 @@ class QueryForObjects(BucketsHelper):
         instance._best_effort_limit = self._best_effort_limit
         instance._limit = self._limit
         instance._offset = self._offset
+        instance._prefetch = self._prefetch
+        instance._item_type = self._item_type
+        instance._resumed = self._resumed
+        instance._checkpoint = self._checkpoint
+        # the aggregations of count() are not cloned, so neither is their JSON
+        instance._compiled = None if self._aggregations else self._compiled
         return instance
 
     def filter(self, *clauses):
+        """
+        a clone matching clauses too. chained filters make one flat AndClause.
+        """
         instance = self.clone()
-        instance.clause = AndClause(instance.clause, *clauses)
+        clause = instance.clause
+        if not clauses:
+            return instance
+        if type(clause) is AndClause:
+            instance.clause = AndClause(*clause.children, *clauses)
+        elif isinstance(clause, AllClause):
+            instance.clause = AndClause(*clauses) if len(clauses) > 1 else clauses[0]
+        else:
+            instance.clause = AndClause(clause, *clauses)
         return instance
 
     def request(self):
-        return super().request(json=self._assemble())
+        payload = self._payload()
+        cache = self.scope.query_cache
+        if cache is None:
+            return super().request(data=payload)
+
+        key = cache.key(self.url, self.access_token, payload)
+        response = cache.get(key)
+        if self.is_async:
+            return self._request_cached_async(cache, key, payload, response)
+
+        if response is not None:
+            return self.process_response(response)
+
+        result = super().request(data=payload)
+        cache.set(key, result.response)
+        return result
+
+    async def _request_cached_async(self, cache, key, payload, response):
+        if response is not None:
+            return self.process_response(response)
+
+        result = await super().request(data=payload)
+        cache.set(key, result.response)
+        return result
 
     def bucket_query(self):
         query = {}
 
-        query['clause'] = self.clause.query()
+        query['clause'] = normalize(self.clause).query()
 
         if self._order_by is not None:
             query['orderBy'] = self._order_by
@@ -285,12 +349,40 @@ class QueryForObjects(BucketsHelper):
 
         return query
 
+    def _compiled_query(self):
+        """
+        JSON of bucket_query(). It is built once and shared with the clones
+        requesting the following pages, so only the page parameters change.
+        It is built again after a clause is modified in place.
+        """
+        revision = Clause.revision
+        if self._compiled is None or self._compiled[0] != revision:
+            self._compiled = revision, json.dumps(self.bucket_query(), ensure_ascii=False,
+                                                  separators=(',', ':'))
+        return self._compiled[1]
+
+    def _payload(self):
+        """
+        the request body, the same JSON as _assemble()
+        """
+        params = json.dumps(self._page_params(), ensure_ascii=False, separators=(',', ':'))
+        if params == '{}':
+            body = '{{"bucketQuery":{0}}}'.format(self._compiled_query())
+        else:
+            body = '{{"bucketQuery":{0},{1}'.format(self._compiled_query(), params[1:])
+        return body.encode('utf-8')
+
     def _assemble(self):
         params = {}
         query = self.bucket_query()
         if query:
             params['bucketQuery'] = query
 
+        params.update(self._page_params())
+        return params
+
+    def _page_params(self):
+        params = {}
         if self._pagination_key:
             params['paginationKey'] = self._pagination_key
 
@@ -313,18 +405,46 @@ class QueryForObjects(BucketsHelper):
                 "putAggregationInto": "count_field"
             }
         ]
+        self._compiled = None
+        if self.is_async:
+            return self._count_async()
+
         result = self.request()
         return result.count
 
+    async def _count_async(self):
+        result = await self.request()
+        return result.count
+
     def first(self):
-        results = self.request()
+        """
+        the first matched object or None. only a page of one object is requested.
+        """
+        query = self.clone().best_effort_limit(1).limit(1)
+        if self.is_async:
+            return query._first_async()
+
+        results = query.request()
         try:
             return results[0]
         except IndexError:
             return None
 
+    async def _first_async(self):
+        results = await self.request()
+        async for item in results:
+            return item
+        return None
+
     def one(self):
-        results = self.request()
+        """
+        the only matched object. at most two objects are requested.
+        """
+        query = self.clone().best_effort_limit(2).limit(min(self._limit or 2, 2))
+        if self.is_async:
+            return query._one_async()
+
+        results = query.request()
         if len(results) > 1:
             raise exc.KiiMultipleResultsFoundError
         try:
@@ -332,10 +452,387 @@ class QueryForObjects(BucketsHelper):
         except IndexError as e:
             raise exc.KiiObjectNotFoundError from e
 
+    async def _one_async(self):
+        results = await self.request()
+        found = []
+        async for item in results:
+            found.append(item)
+            if len(found) > 1:
+                raise exc.KiiMultipleResultsFoundError
+
+        if not found:
+            raise exc.KiiObjectNotFoundError
+        return found[0]
+
+    def stream(self):
+        """
+        iterate over the matched objects without caching them in the result
+        """
+        if self.is_async:
+            return self._astream()
+
+        return self.request().stream()
+
+    async def _astream(self):
+        results = await self.request()
+        async for item in results.astream():
+            yield item
+
+    def iter_pages(self):
+        """
+        iterate over the matched objects page by page without caching them
+        """
+        if self.is_async:
+            return self._aiter_pages()
+
+        return self.request().iter_pages()
+
+    async def _aiter_pages(self):
+        results = await self.request()
+        async for items in results.aiter_pages():
+            yield items
+
+    def fan_out(self, chunk_size=100, *, concurrency=4):
+        """
+        Iterate over the matched objects like stream(), but a large InClause or
+        OrClause is sent as queries of up to chunk_size values (see clauses.split),
+        concurrency of them at a time. An object matched by several queries
+        is returned once.
+
+        With order_by the objects of the queries are merged in that order,
+        otherwise they come query by query. offset and limit apply to the merged objects.
+        """
+        queries = self._fan_out_queries(chunk_size)
+        if len(queries) == 1:
+            return self.stream()
+
+        if self.is_async:
+            return self._fan_out_async(queries, concurrency)
+
+        return self._fan_out(queries, concurrency)
+
+    def _fan_out_queries(self, chunk_size):
+        # each query returns enough objects for offset and limit of the merged ones
+        limit = self._offset + self._limit if self._limit else None
+        queries = []
+        for clause in split(self.clause, chunk_size):
+            query = self.clone()
+            query.clause = clause
+            query._offset, query._limit = 0, limit
+            query._pagination_key, query._resumed, query._checkpoint = None, None, None
+            queries.append(query)
+        return queries
+
+    def _fan_out(self, queries, concurrency):
+        results = bounded_map(lambda query: query.request(), queries, concurrency)
+        if self._order_by is None:
+            objects = chain.from_iterable(result.stream() for result in results)
+        else:
+            objects = heapq.merge(*[result.stream() for result in results],
+                                  key=self._merge_key, reverse=bool(self._descending))
+
+        found = set()
+        for obj in objects:
+            if obj['_id'] in found:
+                continue
+            found.add(obj['_id'])
+            if len(found) > self._offset:
+                yield obj
+            if self._limit and len(found) >= self._offset + self._limit:
+                return
+
+    async def _fan_out_async(self, queries, concurrency):
+        results = abounded_imap(lambda query: query.request(), queries, concurrency)
+        if self._order_by is None:
+            async def chained():
+                async for result in results:
+                    async for obj in result.astream():
+                        yield obj
+            objects = chained()
+        else:
+            objects = amerge([result.astream() async for result in results],
+                             key=self._merge_key, reverse=bool(self._descending))
+
+        found = set()
+        async for obj in objects:
+            if obj['_id'] in found:
+                continue
+            found.add(obj['_id'])
+            if len(found) > self._offset:
+                yield obj
+            if self._limit and len(found) >= self._offset + self._limit:
+                return
+
+    def _merge_key(self, obj):
+        # objects without the field sort after the others, as None is never compared
+        value = obj[self._order_by] if self._order_by in obj else None
+        return value is None, value
+
+    def page(self, size, token=None):
+        """
+        One page of up to size objects in the order of order_by, starting after
+        the position of token (keyset pagination). Returns a Page whose
+        next_token is passed to get the following page.
+
+        Instead of skipping the objects before it like offset, a page asks for
+        the objects after the last key of the previous page, so page N costs
+        the same as page 1 and tokens stay valid while the bucket changes.
+        Objects sharing a key value are carried in the token.
+        Objects without a string, number or boolean in order_by follow
+        the others in the order they were created.
+        """
+        query = self._keyset_query(size, token)
+        if self.is_async:
+            return self._page_async(query, size, token)
+
+        return self._keyset_page(list(query.stream()), size, token)
+
+    async def _page_async(self, query, size, token):
+        items = [item async for item in query.stream()]
+        return self._keyset_page(items, size, token)
+
+    def pages(self, size, token=None):
+        """
+        yield the pages of page() from token until the last one
+        """
+        if self.is_async:
+            return self._apages(size, token)
+
+        return self._pages(size, token)
+
+    def _pages(self, size, token):
+        while True:
+            page = self.page(size, token)
+            if page:
+                yield page
+            token = page.next_token
+            if token is None:
+                return
+
+    async def _apages(self, size, token):
+        while True:
+            page = await self.page(size, token)
+            if page:
+                yield page
+            token = page.next_token
+            if token is None:
+                return
+
+    def _keyset_query(self, size, token):
+        if self._order_by is None:
+            raise exc.KiiQueryNotOrderedError
+
+        query = self.clone().best_effort_limit(size).limit(size)
+        query._offset, query._pagination_key, query._resumed = 0, None, None
+        if token is None:
+            return query.filter(has_field_clause(self._order_by))
+
+        value, object_ids, missing = decode_page_token(token, self._order_by,
+                                                       bool(self._descending))
+        if missing:
+            # the objects without the order_by field, in the order they were created
+            key, descending = '_created', False
+            query = query.filter(NotClause(has_field_clause(self._order_by)))
+            query.order_by(key, descending)
+        else:
+            key, descending = self._order_by, self._descending
+
+        clauses = []
+        if value is not None:
+            clause = RangeClause(key)
+            clauses.append(clause.le(value) if descending else clause.ge(value))
+        if object_ids:
+            clauses.append(NotClause(InClause('_id', object_ids)))
+        return query.filter(*clauses)
+
+    def _keyset_page(self, items, size, token):
+        key, descending = self._order_by, bool(self._descending)
+        last_value, last_ids, missing = None, [], False
+        if token is not None:
+            last_value, last_ids, missing = decode_page_token(token, key, descending)
+
+        if len(items) < size:
+            if missing:
+                return rs.Page(items)
+            # the objects with the field ran out, those without it follow
+            return rs.Page(items, encode_page_token(key, descending, None, [], True))
+
+        field = '_created' if missing else key
+        value = items[-1][field]
+        object_ids = [item['_id'] for item in items if item[field] == value]
+        if last_value == value:
+            # a run of equal keys spans several pages
+            object_ids = last_ids + object_ids
+
+        return rs.Page(items, encode_page_token(key, descending, value, object_ids, missing))
+
+    def to_columns(self, fields=None, *, use_numpy=True):
+        """
+        {field: column} of the matched objects. see QueryResult.to_columns
+        """
+        if self.is_async:
+            return self._to_columns_async(fields, use_numpy)
+
+        return self.clone().as_dicts().request().to_columns(fields, use_numpy=use_numpy)
+
+    async def _to_columns_async(self, fields, use_numpy):
+        results = await self.clone().as_dicts().request()
+        return await results.ato_columns(fields, use_numpy=use_numpy)
+
+    def to_arrays(self, fields, *, use_numpy=True):
+        """
+        the columns of fields in the same order. see QueryResult.to_columns
+        """
+        if self.is_async:
+            return self._to_arrays_async(fields, use_numpy)
+
+        return self.clone().as_dicts().request().to_arrays(fields, use_numpy=use_numpy)
+
+    async def _to_arrays_async(self, fields, use_numpy):
+        results = await self.clone().as_dicts().request()
+        return await results.ato_arrays(fields, use_numpy=use_numpy)
+
+    def delete(self, *, concurrency=1, if_match=False, progress=None):
+        """
+        Delete every matched object. Returns a BulkResult whose items are the objects.
+
+        concurrency: The number of objects deleted at the same time
+        if_match: Send the _version seen by the query as If-Match,
+                  so objects modified in the meantime are not deleted
+        progress: Called with the BulkResult after each object
+
+        Deleting shifts the following pages, so the query is run again
+        until it matches no object which has not been tried yet.
+        A query with limit or offset is run once.
+        """
+        def delete(obj):
+            return self.scope.delete_an_object(obj._id,
+                                               if_match=self._version_of(obj, if_match))
+
+        return self._bulk_until_done(delete, concurrency, progress)
+
+    def update(self, patch, *, concurrency=1, if_match=False, progress=None):
+        """
+        Partially update every matched object with patch.
+        Returns a BulkResult whose items are the objects.
+
+        concurrency: The number of objects updated at the same time
+        if_match: Send the _version seen by the query as If-Match,
+                  so objects modified in the meantime are not overwritten
+        progress: Called with the BulkResult after each object
+
+        When patch changes a field of the clause, the updated objects stop matching
+        and the following pages shift, so the query is run again like delete().
+        """
+        def update(obj):
+            return self.scope.partially_update_an_object(
+                obj._id, patch, if_match=self._version_of(obj, if_match))
+
+        return self._bulk_until_done(update, concurrency, progress)
+
+    def _bulk_until_done(self, fn, concurrency, progress):
+        """
+        call fn with each matched object, running the query again until
+        it matches no object which has not been tried yet
+        """
+        if self.is_async:
+            return self._bulk_until_done_async(fn, concurrency, progress)
+
+        summary = rs.BulkResult(keep_results=False)
+        tried = set()
+
+        def objects():
+            for obj in self.clone().as_records().stream():
+                if obj._id not in tried:
+                    tried.add(obj._id)
+                    yield obj
+
+        while True:
+            total = summary.total
+            self.scope._bulk(fn, objects(), concurrency, summary=summary, progress=progress)
+            if summary.total == total or self._limit or self._offset:
+                return summary
+
+    async def _bulk_until_done_async(self, fn, concurrency, progress):
+        summary = rs.BulkResult(keep_results=False)
+        tried = set()
+
+        async def objects():
+            async for obj in self.clone().as_records().stream():
+                if obj._id not in tried:
+                    tried.add(obj._id)
+                    yield obj
+
+        while True:
+            total = summary.total
+            await self.scope._bulk(fn, objects(), concurrency,
+                                   summary=summary, progress=progress)
+            if summary.total == total or self._limit or self._offset:
+                return summary
+
+    @staticmethod
+    def _version_of(obj, if_match):
+        return obj['_version'] if if_match else None
+
     def offset(self, offset):
+        """
+        skip the first objects. they are still fetched, so use page() for deep pages.
+        """
         self._offset = offset
         return self
 
+    def prefetch(self, pages):
+        """
+        fetch up to the given number of pages ahead in the background
+        while the caller iterates over the current page
+        """
+        self._prefetch = pages
+        return self
+
+    def checkpoint(self, target, every=1):
+        """
+        save the cursor of the iteration every given number of pages and at its end,
+        so the iteration can be resumed after a restart.
+
+        target: A file path the QueryCursor is saved to as JSON,
+                or a callable called with the QueryCursor
+        """
+        self._checkpoint = (target, max(every, 1))
+        return self
+
+    def resume(self, cursor):
+        """
+        continue an iteration from the position of cursor.
+
+        cursor: A QueryCursor (e.g. QueryResult.cursor), its json(), or a file
+                path saved by checkpoint. A missing file starts from the beginning.
+        """
+        if isinstance(cursor, (str, os.PathLike)):
+            cursor = rs.QueryCursor.load(cursor)
+        elif isinstance(cursor, dict):
+            cursor = rs.QueryCursor.from_json(cursor)
+
+        if cursor is not None:
+            self._resumed = cursor.copy()
+            self._pagination_key = cursor.pagination_key
+            self._offset = cursor.offset
+        return self
+
+    def as_records(self):
+        """
+        return the objects as ObjectRecord, a compact read-only ObjectResult
+        which does not keep the HTTP response of its page alive
+        """
+        self._item_type = 'record'
+        return self
+
+    def as_dicts(self):
+        """
+        return the objects as plain dicts
+        """
+        self._item_type = 'dict'
+        return self
+
     def step(self, step):
         self._step = step
         return self
@@ -351,6 +848,7 @@ class QueryForObjects(BucketsHelper):
     def order_by(self, key, descending=True):
         self._order_by = key
         self._descending = descending
+        self._compiled = None
         return self
 
     def pagination_key(self, pagination_key):
@@ -379,16 +877,23 @@ class RetrieveAnObjectBody(BucketsHelper):
 
     def __init__(self, scope, object_id, *,
                  if_match=None,
-                 range=None):
+                 range=None,
+                 stream=False):
+        """
+        stream: Do not read the body until BodyResult.body or
+                BodyResult.iter_content() is used
+        """
         super().__init__(scope)
         self.object_id = object_id
         self.if_match = if_match
 
         # range is tuple or list. e.g.) [begin, end]
+        # end may be '' to read until the end of the body.
         if range is not None and not isinstance(range, (list, tuple)):
             raise exc.KiiInvalidTypeError
 
         self.range = range
+        self.stream = stream
 
     @property
     def api_path(self):
@@ -413,6 +918,12 @@ class RetrieveAnObjectBody(BucketsHelper):
 
         return headers
 
+    def request(self):
+        if self.stream and not self.is_async:
+            return super().request(stream=True)
+
+        return super().request()
+
 
 class AddOrReplaceAnObjectBody(BucketsHelper):
     method = 'PUT'
@@ -451,8 +962,23 @@ class AddOrReplaceAnObjectBody(BucketsHelper):
         return headers
 
     def request(self):
+        """
+        body is sent as a stream when it is an os.PathLike, a file object
+        or an iterable of bytes (chunked transfer encoding).
+        """
+        if isinstance(self.body, os.PathLike):
+            if self.is_async:
+                return self._request_path_async()
+
+            with open(self.body, 'rb') as f:
+                return super().request(data=f)
+
         return super().request(data=self.body)
 
+    async def _request_path_async(self):
+        with open(self.body, 'rb') as f:
+            return await super().request(data=f)
+
 
 class VerifyTheObjectBodyExistence(BucketsHelper):
     method = 'HEAD'
@@ -26,4 +26,4 @@ class SetTheObjectBodyUploadStatusToCommitted(BucketsHelper):
         return headers
 
     def request(self):
-        super().request(data='')
+        return super().request(data='')
@@ -36,4 +36,4 @@ class UploadTheGivenObjectData(BucketsHelper):
         return headers
 
     def request(self):
-        super().request(data=self.body)
+        return super().request(data=self.body)
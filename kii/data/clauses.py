@@ -1,11 +1,22 @@
 from copy import deepcopy
 from enum import Enum, unique
+from itertools import count
 import json
 
 from kii import exceptions as exc
 
 
+_revisions = count(1)
+
+
 class Clause:
+    # a new value whenever any clause is modified in place,
+    # so a compiled query knows its JSON may be stale without walking its clause
+    revision = 0
+
+    def _modified(self):
+        Clause.revision = next(_revisions)
+
     def __str__(self):
         return '<Clause Object:{0}> {1}'.format(
             id(self),
@@ -64,6 +75,7 @@ class AndClause(Clause):
             raise exc.KiiInvalidClauseError
 
         self.children.append(clause)
+        self._modified()
         return self
 
     def query(self):
@@ -238,19 +250,182 @@ class RangeClause(Clause):
     def ge(self, lower_limit):
         self.lower_limit = lower_limit
         self.lower_included = True
+        self._modified()
         return self
 
     def gt(self, lower_limit):
         self.lower_limit = lower_limit
         self.lower_included = False
+        self._modified()
         return self
 
     def le(self, upper_limit):
         self.upper_limit = upper_limit
         self.upper_included = True
+        self._modified()
         return self
 
     def lt(self, upper_limit):
         self.upper_limit = upper_limit
         self.upper_included = False
+        self._modified()
         return self
+
+
+def has_field_clause(field):
+    """
+    clause of the objects which have a string, number or boolean in field
+    """
+    return OrClause(*(HasFieldClause(field, field_type)
+                      for field_type in HasFieldClause.Types))
+
+
+def normalize(clause):
+    """
+    An equivalent clause which is smaller to send:
+    nested AndClause and OrClause are flattened, AllClause is dropped from
+    an AndClause (and makes an OrClause match everything), EqualClause and
+    InClause on the same field of an OrClause are merged into one InClause,
+    and duplicated clauses are removed. clause itself is not modified.
+    """
+    if type(clause) is AndClause:
+        children = []
+        for child in _flatten(clause, AndClause):
+            if not isinstance(child, AllClause):
+                children.append(child)
+        return _combine(AndClause, _unique(children))
+
+    if type(clause) is OrClause:
+        children = list(_flatten(clause, OrClause))
+        if any(isinstance(child, AllClause) for child in children):
+            return AllClause()
+        return _combine(OrClause, _unique(_merge_equals(children)))
+
+    if type(clause) is NotClause:
+        inner = normalize(clause.clause)
+        if type(inner) is NotClause:
+            return inner.clause
+        return NotClause(inner)
+
+    return clause
+
+
+def _flatten(clause, cls):
+    for child in clause.children:
+        child = normalize(child)
+        if type(child) is cls:
+            yield from child.children
+        else:
+            yield child
+
+
+def _combine(cls, children):
+    if not children:
+        return AllClause()
+    if len(children) == 1:
+        return children[0]
+    return cls(*children)
+
+
+def _key(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _unique(clauses):
+    found = {}
+    for clause in clauses:
+        found.setdefault(_key(clause.query()), clause)
+    return list(found.values())
+
+
+def _merge_equals(clauses):
+    """
+    replace EqualClause and InClause on the same field with one InClause
+    """
+    values = {}
+    for clause in clauses:
+        if type(clause) is EqualClause:
+            values.setdefault(clause.field, {}).setdefault(_key(clause.value), clause.value)
+        elif type(clause) is InClause:
+            for value in clause.values:
+                values.setdefault(clause.field, {}).setdefault(_key(value), value)
+
+    merged = []
+    for clause in clauses:
+        if type(clause) in (EqualClause, InClause):
+            field_values = values.pop(clause.field, None)
+            if field_values is None:
+                continue
+            if len(field_values) == 1 and type(clause) is EqualClause:
+                merged.append(clause)
+            else:
+                merged.append(InClause(clause.field, list(field_values.values())))
+        else:
+            merged.append(clause)
+    return merged
+
+
+def split(clause, chunk_size):
+    """
+    Clauses of up to chunk_size values each which together match the objects of clause:
+    a large InClause is split into chunks of its values, the children of a large
+    OrClause into groups, and an AndClause on its largest InClause or OrClause.
+    An object may match more than one of them.
+    """
+    clause = normalize(clause)
+    chunk_size = max(chunk_size, 1)
+    if _weight(clause) <= chunk_size:
+        return [clause]
+
+    if type(clause) is InClause:
+        values = list(clause.values)
+        return [InClause(clause.field, values[i:i + chunk_size])
+                for i in range(0, len(values), chunk_size)]
+
+    if type(clause) is OrClause:
+        groups = [[]]
+        size = 0
+        for child in clause.children:
+            if type(child) is InClause:
+                # the values of an InClause fill up the room left in each group
+                values = list(child.values)
+                while values:
+                    if size >= chunk_size:
+                        groups.append([])
+                        size = 0
+                    room = chunk_size - size
+                    groups[-1].append(InClause(child.field, values[:room]))
+                    size += len(values[:room])
+                    values = values[room:]
+                continue
+
+            for part in split(child, chunk_size):
+                weight = _weight(part)
+                if groups[-1] and size + weight > chunk_size:
+                    groups.append([])
+                    size = 0
+                groups[-1].append(part)
+                size += weight
+        return [_combine(OrClause, group) for group in groups]
+
+    if type(clause) is AndClause:
+        children = clause.children
+        index = max(range(len(children)), key=lambda i: _weight(children[i]))
+        return [AndClause(*children[:index], part, *children[index + 1:])
+                for part in split(children[index], chunk_size)]
+
+    return [clause]
+
+
+def _weight(clause):
+    """
+    the number of values of an InClause, of the children of an OrClause,
+    or of the largest child of an AndClause
+    """
+    if type(clause) is InClause:
+        return len(clause.values)
+    if type(clause) is OrClause:
+        return sum(_weight(child) for child in clause.children)
+    if type(clause) is AndClause:
+        return max(_weight(child) for child in clause.children)
+    return 1
@@ -118,6 +118,15 @@ class KiiIllegalAccessError(KiiInternvalAPIError):
     default_message = 'illegal access error'
 
 
+class KiiIncompleteDownloadError(KiiInternvalAPIError):
+    default_message = 'object body download is incomplete'
+
+    def __init__(self, msg=None, missing=None):
+        super().__init__(msg)
+        # (begin, end) byte ranges which were not written
+        self.missing = missing or []
+
+
 class KiiInvalidAccountTypeError(KiiInternvalAPIError):
     default_message = 'invalid account type'
 
@@ -142,6 +151,10 @@ class KiiInvalidGroupIdError(KiiInternvalAPIError):
     default_message = 'group id is invalid'
 
 
+class KiiInvalidPageTokenError(KiiInternvalAPIError):
+    default_message = 'page token is invalid for this query'
+
+
 class KiiInvalidTypeError(KiiInternvalAPIError):
     default_message = 'invalid type error'
 
@@ -150,6 +163,10 @@ class KiiMultipleResultsFoundError(KiiInternvalAPIError):
     default_message = 'multiple results found error'
 
 
+class KiiQueryNotOrderedError(KiiInternvalAPIError):
+    default_message = 'query has no order_by'
+
+
 class KiiUserHasNotAccessTokenError(KiiHasNotPropertyError):
     default_message = 'user has not access token'
 
@@ -1,5 +1,4 @@
 import logging
-import requests
 
 from kii.exceptions import KiiAPIError, KiiHasNotAccessTokenError
 
@@ -24,14 +23,10 @@ class RequestHelper:
         }
 
     def request(self, **kwargs):
-        logger.debug('METHOD:%s URL:%s HEADERS:%s KWARGS:%s',
-                     self.method, self.url, self.headers, kwargs)
-        response = requests.request(self.method,
-                                    self.url,
-                                    headers=self.headers,
-                                    **kwargs)
+        return self.api.transport.send(self, **kwargs)
 
-        logger.info('%s %s %d', self.method, self.url, response.status_code)
+    def process_response(self, response):
+        logger.info('%s %s %d', self.method, response.url, response.status_code)
 
         if response.status_code >= 400:
             raise KiiAPIError.distribute_error(response)
@@ -39,6 +34,10 @@ class RequestHelper:
         result = self.result_container(self, response)
         return result
 
+    @property
+    def is_async(self):
+        return self.api.transport.is_async
+
     @property
     def token_type(self):
         return self.api.token_type
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    rate: Tokens added per second
+    burst: The capacity of the bucket (defaults to rate, at least 1)
+
+    Callers reserve a token and sleep until it is due, so waiting callers
+    are served in order instead of polling the bucket.
+    """
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        take tokens and return the seconds to wait before using them
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._last) * self.rate, self.burst)
+            self._last = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Client-side rate limit shared by every helper of a KiiAPI and its clones.
+
+    rate: Requests per second over all requests
+    burst: Requests allowed at once before rate applies
+    limits: Additional {endpoint class: rate or (rate, burst)} limits.
+            The endpoint class of a helper is its rate_class attribute, or
+            'read' for GET/HEAD and 'write' for the other methods.
+            QueryForObjects is 'query'.
+
+        >>> RateLimiter(100, limits={'write': (20, 5), 'query': 10})
+    """
+    def __init__(self, rate=None, burst=None, *, limits=None):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.buckets = {}
+        for name, limit in (limits or {}).items():
+            if not isinstance(limit, (tuple, list)):
+                limit = (limit,)
+            self.buckets[name] = TokenBucket(*limit)
+
+        self._lock = threading.Lock()
+        self.waited = 0
+
+    @staticmethod
+    def rate_class(helper):
+        rate_class = getattr(helper, 'rate_class', None)
+        if rate_class is not None:
+            return rate_class
+        return 'read' if helper.method in ('GET', 'HEAD') else 'write'
+
+    def reserve(self, helper):
+        wait = 0
+        if self.bucket is not None:
+            wait = self.bucket.reserve()
+
+        bucket = self.buckets.get(self.rate_class(helper))
+        if bucket is not None:
+            wait = max(wait, bucket.reserve())
+
+        if wait:
+            with self._lock:
+                self.waited += wait
+        return wait
+
+    def acquire(self, helper):
+        wait = self.reserve(helper)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, helper):
+        wait = self.reserve(helper)
+        if wait:
+            await asyncio.sleep(wait)
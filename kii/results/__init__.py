@@ -1,12 +1,15 @@
 from .base import BaseResult  # NOQA
 from .body import BodyResult  # NOQA
 from .bucket import BucketResult  # NOQA
+from .bulk import BulkResult, ObjectsResult  # NOQA
 from .create import CreateResult  # NOQA
+from .cursor import QueryCursor  # NOQA
 from .delete import DeleteResult  # NOQA
 from .group import GroupResult  # NOQA
 from .groupcreation import GroupCreationResult  # NOQA
 from .groupinformation import GroupInformationResult  # NOQA
-from .object import ObjectResult  # NOQA
+from .object import ObjectRecord, ObjectResult  # NOQA
+from .page import Page  # NOQA
 from .publishbody import PublishBodyResult  # NOQA
 from .querycount import QueryCountResult  # NOQA
 from .queryresult import QueryResult  # NOQA
@@ -1,12 +1,33 @@
 import json
 from collections.abc import MutableMapping
 
+from kii import codec
+
 
 class BaseResult(MutableMapping):
     def __init__(self, request_helper, response=None):
         self.request_helper = request_helper
         self.response = response
-        self.set_result(response.text and response.json())
+
+    @property
+    def _result(self):
+        # the response body is decoded on the first access
+        try:
+            return self.__dict__['_result']
+        except KeyError:
+            self.set_result(self.decode(self.response))
+            return self.__dict__['_result']
+
+    @_result.setter
+    def _result(self, result):
+        self.__dict__['_result'] = result
+
+    @staticmethod
+    def decode(response):
+        content = response.content
+        if not content:
+            return ''
+        return codec.loads(content)
 
     def __getitem__(self, key):
         return self._result[key]
@@ -1,15 +1,71 @@
 from .base import BaseResult
 
 
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
 class BodyResult(BaseResult):
     def __init__(self, request_helper, response):
         self.request_helper = request_helper
         self.response = response
-        self.set_result(response.content)
+        if not getattr(request_helper, 'stream', False):
+            self.set_result(response.content)
 
     def __str__(self):
         return self.body.decode('utf-8')
 
     @property
     def body(self):
+        if '_result' not in self.__dict__:
+            self.set_result(self.response.content)
         return self._result
+
+    @property
+    def content_range(self):
+        """
+        (begin, end, total) of a ranged response, otherwise None
+        """
+        content_range = self.response.headers.get('Content-Range')
+        if not content_range:
+            return None
+
+        unit_range, total = content_range.split(' ')[-1].split('=')[-1].split('/')
+        begin, end = unit_range.split('-')
+        return int(begin), int(end), None if total == '*' else int(total)
+
+    @property
+    def total_size(self):
+        """
+        size of the whole body, even when only a range of it was requested
+        """
+        content_range = self.content_range
+        if content_range is not None:
+            return content_range[2]
+
+        length = self.response.headers.get('Content-Length')
+        return None if length is None else int(length)
+
+    def iter_content(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        yield the body in chunks. a streamed body is read from the connection
+        as it is consumed.
+        """
+        if '_result' in self.__dict__ or not hasattr(self.response, 'iter_content'):
+            body = self.body
+            for start in range(0, len(body), chunk_size):
+                yield body[start:start + chunk_size]
+            return
+
+        try:
+            for chunk in self.response.iter_content(chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            self.response.close()
+
+    def write_to(self, fp, chunk_size=DEFAULT_CHUNK_SIZE):
+        written = 0
+        for chunk in self.iter_content(chunk_size):
+            fp.write(chunk)
+            written += len(chunk)
+        return written
@@ -0,0 +1,61 @@
+import json
+
+
+class BulkResult:
+    """
+    Summary of a bulk operation.
+
+    results: The result of each item in input order (None for failed items),
+             or None when the results are not kept
+    errors: (index, item, exception) of each failed item
+    """
+    def __init__(self, keep_results=True):
+        self.total = 0
+        self.succeeded = 0
+        self.errors = []
+        self.results = [] if keep_results else None
+
+    def add(self, index, item, result=None, error=None):
+        self.total += 1
+        if error is None:
+            self.succeeded += 1
+        else:
+            self.errors.append((index, item, error))
+
+        if self.results is not None:
+            self.results.append(result)
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    @property
+    def failed_items(self):
+        return [item for _, item, _ in self.errors]
+
+    def __bool__(self):
+        return not self.errors
+
+    def __repr__(self):
+        return '{0} RESULTS {1}'.format(super().__repr__(), str(self))
+
+    def __str__(self):
+        return json.dumps(self.json())
+
+    def json(self):
+        return {
+            'total': self.total,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+        }
+
+
+class ObjectsResult(dict):
+    """
+    ObjectResult keyed by object id in the order of the requested ids.
+
+    missing: The requested ids which were not found
+    """
+    def __init__(self, objects=(), missing=()):
+        super().__init__(objects)
+        self.missing = list(missing)
@@ -0,0 +1,134 @@
+from array import array
+import math
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+TIMESTAMP_FIELDS = ('_created', '_modified')
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+_MISSING = object()
+
+
+class ColumnBuilder:
+    """
+    Append-only column of one field.
+
+    Integers are packed into array('q') and floats into array('d') while
+    every value fits, a missing value turns an integer column into floats
+    with NaN, and anything else falls back to a list.
+    """
+    __slots__ = ('values', 'kind', 'leading')
+
+    def __init__(self, missing=0):
+        self.values = None
+        self.kind = None
+        self.leading = missing
+
+    def __len__(self):
+        if self.kind is None:
+            return self.leading
+        return len(self.values)
+
+    def append(self, value):
+        kind = self.kind
+        if kind == 'q':
+            if type(value) is int and INT64_MIN <= value <= INT64_MAX:
+                self.values.append(value)
+                return
+            self._as_floats() if _is_float_like(value) else self._as_list()
+        elif kind == 'd':
+            if _is_float_like(value) or type(value) is int:
+                self.values.append(math.nan if value is _MISSING or value is None else value)
+                return
+            self._as_list()
+        elif kind is None:
+            if value is _MISSING or value is None:
+                self.leading += 1
+                return
+            self._start(value)
+
+        if self.kind == 'list':
+            self.values.append(None if value is _MISSING else value)
+        else:
+            self.append(value)
+
+    def _start(self, value):
+        if type(value) is int and not self.leading:
+            self.kind, self.values = 'q', array('q')
+        elif type(value) in (int, float):
+            self.kind, self.values = 'd', array('d', [math.nan] * self.leading)
+        else:
+            self.kind, self.values = 'list', [None] * self.leading
+
+    def _as_floats(self):
+        self.kind, self.values = 'd', array('d', self.values)
+
+    def _as_list(self):
+        values = self.values.tolist()
+        if self.kind == 'd':
+            values = [None if math.isnan(v) else v for v in values]
+        self.kind, self.values = 'list', values
+
+    def build(self, timestamp=False, use_numpy=True):
+        """
+        the column as a NumPy array when use_numpy and NumPy is installed,
+        otherwise as array.array or list. timestamp columns of integers
+        become datetime64[ms] with NumPy.
+        """
+        if self.kind is None:
+            self.kind, self.values = 'list', [None] * self.leading
+
+        if not use_numpy or numpy is None:
+            return self.values
+
+        if self.kind == 'q':
+            column = numpy.frombuffer(self.values, dtype=numpy.int64)
+            return column.astype('datetime64[ms]') if timestamp else column
+        if self.kind == 'd':
+            return numpy.frombuffer(self.values, dtype=numpy.float64)
+
+        if any(v is None for v in self.values):
+            return numpy.array(self.values, dtype=object)
+        return numpy.array(self.values)
+
+
+def _is_float_like(value):
+    return value is _MISSING or value is None or type(value) is float
+
+
+class ColumnsBuilder:
+    """
+    {field: ColumnBuilder} filled object by object.
+
+    fields: The fields to collect. When None, every field found is collected
+            and objects without it get a missing value.
+    """
+    def __init__(self, fields=None):
+        self.fixed = fields is not None
+        self.columns = {field: ColumnBuilder() for field in (fields or ())}
+        self.count = 0
+
+    def append(self, obj):
+        columns = self.columns
+        if not self.fixed:
+            for field in obj:
+                if field not in columns:
+                    columns[field] = ColumnBuilder(missing=self.count)
+
+        for field, column in columns.items():
+            column.append(obj.get(field, _MISSING))
+        self.count += 1
+
+    def extend(self, objects):
+        for obj in objects:
+            self.append(obj)
+
+    def build(self, use_numpy=True):
+        return {field: column.build(field in TIMESTAMP_FIELDS, use_numpy)
+                for field, column in self.columns.items()}
@@ -1,5 +1,3 @@
-from datetime import datetime
-
 from .object import ObjectResult
 
 
@@ -25,7 +23,7 @@ class CreateResult(ObjectResult):
 
     @property
     def created_at(self):
-        return datetime.fromtimestamp(self._result['createdAt'] / 1000)
+        return self._datetime('createdAt')
 
     @property
     def createdAt(self):
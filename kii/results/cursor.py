@@ -0,0 +1,63 @@
+import json
+import os
+
+from kii.utils import save_json
+
+
+class QueryCursor:
+    """
+    Position of an iteration over the results of a query.
+    Save it and pass it to QueryForObjects.resume to continue after a restart.
+
+    pagination_key: The key of the page holding the next object. None for the first page.
+    offset: The number of objects skipped from that page on,
+            i.e. the offset of the resumed query
+    count: The number of objects returned so far
+    done: Every object has been returned
+    """
+    def __init__(self, pagination_key=None, offset=0, count=0, done=False):
+        self.pagination_key = pagination_key
+        self.offset = offset
+        self.count = count
+        self.done = done
+
+    def copy(self):
+        return QueryCursor(self.pagination_key, self.offset, self.count, self.done)
+
+    def __eq__(self, other):
+        return isinstance(other, QueryCursor) and self.json() == other.json()
+
+    def __repr__(self):
+        return '{0} {1}'.format(super().__repr__(), str(self))
+
+    def __str__(self):
+        return json.dumps(self.json())
+
+    def json(self):
+        return {
+            'paginationKey': self.pagination_key,
+            'offset': self.offset,
+            'count': self.count,
+            'done': self.done,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data.get('paginationKey'),
+                   data.get('offset', 0),
+                   data.get('count', 0),
+                   data.get('done', False))
+
+    def save(self, path):
+        save_json(path, self.json())
+
+    @classmethod
+    def load(cls, path):
+        """
+        the cursor saved in path, or None when there is no such file
+        """
+        try:
+            with open(os.fspath(path)) as f:
+                return cls.from_json(json.load(f))
+        except FileNotFoundError:
+            return None
@@ -1,19 +1,40 @@
+from collections.abc import Mapping
 from datetime import datetime
+import json
 
 from .base import BaseResult
 
 
-class ObjectResult(BaseResult):
+class ObjectMixin:
     """
-    for buckets result
+    accessors and operations of a bucket object.
+    the class needs _result, scope and set_result().
     """
-    def set_result(self, result):
-        super().set_result(result)
-        return self
+    __slots__ = ()
+
+    _timestamps = None
+
+    def _datetime(self, field):
+        """
+        datetime of a timestamp field in milliseconds, converted once per value
+        """
+        value = self._result[field]
+        try:
+            cached, converted = self._timestamps[field]
+            if cached == value:
+                return converted
+        except TypeError:
+            self._timestamps = {}
+        except KeyError:
+            pass
+
+        converted = datetime.fromtimestamp(value / 1000)
+        self._timestamps[field] = (value, converted)
+        return converted
 
     @property
     def _created(self):
-        return datetime.fromtimestamp((self._result['_created']) / 1000)
+        return self._datetime('_created')
 
     @property
     def _id(self):
@@ -21,7 +42,7 @@ class ObjectResult(BaseResult):
 
     @property
     def _modified(self):
-        return datetime.fromtimestamp((self._result['_modified']) / 1000)
+        return self._datetime('_modified')
 
     @property
     def _owner(self):
@@ -32,40 +53,108 @@ class ObjectResult(BaseResult):
         return int(self._result['_version'])
 
     def refresh(self):
-        scope = self.request_helper.scope
+        scope = self.scope
+        if scope.api.transport.is_async:
+            return self._refresh_async(scope)
+
         new = scope.retrieve_an_object(self._id)
         return self.set_result(new.json())
 
+    async def _refresh_async(self, scope):
+        new = await scope.retrieve_an_object(self._id)
+        return self.set_result(new.json())
+
     def partially_update(self, params, **kwargs):
-        scope = self.request_helper.scope
+        scope = self.scope
         return scope.partially_update_an_object(self._id, params, **kwargs)
 
     def retrieve_body(self, **kwargs):
-        scope = self.request_helper.scope
+        scope = self.scope
         return scope.retrieve_an_object_body(self._id, **kwargs)
 
+    def download_body(self, target, **kwargs):
+        scope = self.scope
+        return scope.download_an_object_body(self._id, target, **kwargs)
+
     def add_or_replace_body(self, body, content_type):
-        scope = self.request_helper.scope
+        scope = self.scope
         return scope.add_or_replace_an_object_body(self._id, body, content_type)
 
     def verify_body(self):
-        scope = self.request_helper.scope
+        scope = self.scope
         return scope.verify_the_object_body_existence(self._id)
 
     def has_body(self):
-        scope = self.request_helper.scope
+        scope = self.scope
         return scope.has_body(self._id)
 
     def delete_body(self):
-        scope = self.request_helper.scope
+        scope = self.scope
         return scope.delete_an_object_body(self._id)
 
     def publish_body(self, *, expires_at=None, expires_in=None):
-        scope = self.request_helper.scope
+        scope = self.scope
         return scope.publish_an_object_body(self._id,
                                             expires_at=expires_at,
                                             expires_in=expires_in)
 
-    def upload_body_multiple_pieces(self, body, content_type, piece_byte=1024 * 1024):
-        scope = self.request_helper.scope
-        return scope.upload_body_multiple_pieces(self._id, body, content_type, piece_byte)
+    def upload_body_multiple_pieces(self, body, content_type, piece_byte=1024 * 1024, **kwargs):
+        scope = self.scope
+        return scope.upload_body_multiple_pieces(self._id, body, content_type, piece_byte,
+                                                 **kwargs)
+
+
+class ObjectResult(ObjectMixin, BaseResult):
+    """
+    for buckets result
+    """
+    def set_result(self, result):
+        super().set_result(result)
+        return self
+
+    @property
+    def scope(self):
+        return self.request_helper.scope
+
+
+class ObjectRecord(ObjectMixin, Mapping):
+    """
+    Compact read-only ObjectResult for large query results.
+    It keeps the object and its scope only, neither the request helper
+    nor the HTTP response of its page.
+    """
+    __slots__ = ('_result', 'scope', '_timestamps')
+
+    def __init__(self, scope, result):
+        self.scope = scope
+        self._result = result
+        self._timestamps = None
+
+    def set_result(self, result):
+        self._result = result
+        return self
+
+    def __getitem__(self, key):
+        return self._result[key]
+
+    def __iter__(self):
+        return iter(self._result)
+
+    def __len__(self):
+        return len(self._result)
+
+    def __contains__(self, item):
+        return item in self._result
+
+    def __repr__(self):
+        return '{0} RESULTS {1}'.format(object.__repr__(self), str(self))
+
+    def __str__(self):
+        return json.dumps(self._result)
+
+    @property
+    def bucket_id(self):
+        return self.scope.bucket_id
+
+    def json(self):
+        return self._result
@@ -0,0 +1,44 @@
+import base64
+import binascii
+import json
+
+from kii import exceptions as exc
+
+
+class Page(list):
+    """
+    Objects of one page of keyset pagination.
+
+    next_token: The token of the following page, or None after the last page
+    """
+    def __init__(self, items=(), next_token=None):
+        super().__init__(items)
+        self.next_token = next_token
+
+
+def encode_page_token(key, descending, value, object_ids, missing=False):
+    """
+    token of the position after the objects of object_ids,
+    which are the last ones whose key is value.
+    missing: The position is among the objects without key,
+             and value is their _created
+    """
+    data = json.dumps([key, descending, value, object_ids, missing],
+                      ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_page_token(token, key, descending):
+    """
+    (value, object_ids, missing) of a token made for the same key and order
+    """
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        token_key, token_descending, value, object_ids, missing = \
+            json.loads(data.decode('utf-8'))
+    except (binascii.Error, TypeError, UnicodeDecodeError, ValueError) as e:
+        raise exc.KiiInvalidPageTokenError from e
+
+    if token_key != key or token_descending != descending:
+        raise exc.KiiInvalidPageTokenError
+    return value, object_ids, missing
@@ -1,14 +1,26 @@
+from itertools import chain, islice
 import json
+import weakref
+
+from kii.utils import aprefetch, prefetch
 
 from .base import BaseResult
-from .object import ObjectResult
+from .columns import ColumnsBuilder
+from .cursor import QueryCursor
+from .object import ObjectRecord, ObjectResult
 
 
 class QueryResult(BaseResult):
     def __init__(self, request_helper, response=None):
         super().__init__(request_helper, response)
+        # a page is always consumed, so it is decoded at once
+        self.set_result(self.decode(response))
         self._cache_results = []
         self._finished = False
+        self._source = None
+        self._prefetchers = weakref.WeakSet()
+        self._count = None
+        self._begin()
 
     @property
     def all_items(self):
@@ -20,21 +32,111 @@ class QueryResult(BaseResult):
     def __len__(self):
         return len(self.all_items)
 
+    @property
+    def count(self):
+        """
+        the number of matched objects. When no object has been read yet and there
+        are more pages, it is a COUNT aggregation instead of fetching every page.
+        len() always reads every page, since list() and sorted() call it too.
+        Results of AsyncKiiAPI are counted with "await result.acount()".
+        """
+        if self.request_helper.is_async:
+            raise TypeError('a query result of AsyncKiiAPI is counted with '
+                            '"await result.acount()"')
+
+        if self._counts_items():
+            return len(self.all_items)
+
+        if self._count is None:
+            self._count = self._limited(self.request_helper.clone().count())
+        return self._count
+
+    async def acount(self):
+        """
+        count of a result of AsyncKiiAPI
+        """
+        if self._counts_items():
+            async for _ in self:
+                pass
+            return len(self._cache_results)
+
+        if self._count is None:
+            self._count = self._limited(await self.request_helper.clone().count())
+        return self._count
+
+    def _counts_items(self):
+        """
+        whether the objects are counted instead of asking the server for a COUNT
+        """
+        helper = self.request_helper
+        return self._finished or self._source is not None or \
+            not self.next_pagination_key or \
+            helper._resumed is not None or helper._pagination_key is not None
+
+    def _limited(self, count):
+        """
+        COUNT of the query with its offset and limit applied
+        """
+        helper = self.request_helper
+        count = max(count - helper._offset, 0)
+        if helper._limit:
+            count = min(count, helper._limit)
+        return count
+
     def __getitem__(self, key):
-        return self.all_items[key]
+        count = self._needed(key)
+        if count is None:
+            return self.all_items[key]
+        return self._fill(count)[key]
 
     def __setitem__(self, key, val):
-        self.all_items[key] = val
+        count = self._needed(key)
+        if count is None:
+            self.all_items[key] = val
+        else:
+            self._fill(count)[key] = val
+
+    @staticmethod
+    def _needed(key):
+        """
+        the number of items needed to resolve key, or None when it needs all items
+        """
+        if isinstance(key, slice):
+            if key.stop is None or key.stop < 0 or (key.start or 0) < 0 or \
+                    (key.step or 1) < 0:
+                return None
+            return key.stop
+
+        if key < 0:
+            return None
+        return key + 1
+
+    def _fill(self, count):
+        """
+        fetch only the pages needed to cache count items
+        """
+        if not self._finished and len(self._cache_results) < count:
+            for _ in islice(self, count):
+                pass
+        return self._cache_results
 
     def __delitem__(self, key):
         self.all_items.pop(key)
 
     def __bool__(self):
-        if not self._finished:
-            b = bool(self._cache_results)
-            if b:
-                return True
-        return bool(self.all_items)
+        if self.request_helper.is_async:
+            raise TypeError('a query result of AsyncKiiAPI is tested with '
+                            '"await result.aexists()"')
+        return bool(self._fill(1))
+
+    async def aexists(self):
+        """
+        bool() of a result of AsyncKiiAPI
+        """
+        if not self._cache_results and not self._finished:
+            async for _ in self:
+                break
+        return bool(self._cache_results)
 
     def pop(self, index=None):
         if index is None:
@@ -43,67 +145,282 @@ class QueryResult(BaseResult):
             return self.all_items.pop(index)
 
     def __iter__(self):
-        if self._finished:
-            for item in self._cache_results:
-                yield item
-            return
+        if self.request_helper.is_async:
+            raise TypeError('a query result of AsyncKiiAPI is iterated with '
+                            '"async for". use count() of the query for the number of objects')
+
+        index = 0
+        while True:
+            while index < len(self._cache_results):
+                yield self._cache_results[index]
+                index += 1
+
+            if self._finished:
+                return
 
-        for item in self._cache_results[:]:
-            yield item
+            if self._source is None:
+                self._source = self._select(self._pages())
 
-        cache_offset = len(self._cache_results)
-        count = -self.request_helper._offset
-        for item in self._items[cache_offset:]:
-            count += 1
-            if count <= 0:
-                continue
-            if self.request_helper._limit and count > self.request_helper._limit:
+            try:
+                self._cache_results.append(next(self._source))
+            except StopIteration:
                 self._finished = True
+                self.close()
+
+    async def __aiter__(self):
+        index = 0
+        while True:
+            while index < len(self._cache_results):
+                yield self._cache_results[index]
+                index += 1
+
+            if self._finished:
                 return
 
-            self._cache_results.append(item)
-            yield item
+            if self._source is None:
+                self._source = self._aselect(self._apages())
 
-        while self.next_pagination_key:
-            if self.request_helper._limit and count >= self.request_helper._limit:
+            try:
+                self._cache_results.append(await self._source.__anext__())
+            except StopAsyncIteration:
                 self._finished = True
+
+    def _begin(self):
+        """
+        a new cursor at the position the query starts from, and the limit
+        """
+        helper = self.request_helper
+        resumed = helper._resumed
+        limit = helper._limit
+        self.cursor = QueryCursor(helper._pagination_key, helper._offset)
+        if resumed is not None:
+            self.cursor.count = resumed.count
+            self.cursor.done = resumed.done or bool(limit and resumed.count >= limit)
+        self._passed_pages = 0
+        return self.cursor, limit
+
+    def _take(self, page, cursor, limit):
+        """
+        the items of page left after offset and limit
+        """
+        cursor.pagination_key = page.request_helper._pagination_key
+        items = page._items
+        if cursor.offset:
+            items = items[cursor.offset:]
+        if limit:
+            items = items[:limit - cursor.count]
+        return items
+
+    def _pass(self, page, cursor, offset, count, limit):
+        """
+        move cursor behind page, whatever was consumed from it
+        """
+        cursor.pagination_key = page.next_pagination_key
+        cursor.offset = max(offset - len(page._items), 0)
+        cursor.count = count
+        cursor.done = not page.next_pagination_key or bool(limit and count >= limit)
+
+        checkpoint = self.request_helper._checkpoint
+        if checkpoint is None:
+            return
+
+        target, every = checkpoint
+        self._passed_pages += 1
+        if self._passed_pages % every == 0 or cursor.done:
+            if callable(target):
+                target(cursor.copy())
+            else:
+                cursor.save(target)
+
+    def _select_pages(self, pages):
+        """
+        apply offset and limit to the items of the pages and keep the cursor
+        """
+        cursor, limit = self._begin()
+        if cursor.done:
+            return
+
+        for page in pages:
+            offset, count = cursor.offset, cursor.count
+            items = self._take(page, cursor, limit)
+            if items:
+                yield items
+
+            self._pass(page, cursor, offset, count + len(items), limit)
+            if cursor.done:
                 return
 
-            helper = self.request_helper.clone()
-            result = helper.pagination_key(self.next_pagination_key).request()
+    async def _aselect_pages(self, pages):
+        cursor, limit = self._begin()
+        if cursor.done:
+            return
+
+        async for page in pages:
+            offset, count = cursor.offset, cursor.count
+            items = self._take(page, cursor, limit)
+            if items:
+                yield items
 
-            for item in result._items:
-                count += 1
-                if count <= 0:
-                    continue
+            self._pass(page, cursor, offset, count + len(items), limit)
+            if cursor.done:
+                return
 
-                if self.request_helper._limit and count > self.request_helper._limit:
-                    self._finished = True
-                    return
+    def _select(self, pages):
+        for items in self._select_pages(pages):
+            cursor = self.cursor
+            for item in items:
+                cursor.offset += 1
+                cursor.count += 1
+                yield item
 
-                self._cache_results.append(item)
+    async def _aselect(self, pages):
+        async for items in self._aselect_pages(pages):
+            cursor = self.cursor
+            for item in items:
+                cursor.offset += 1
+                cursor.count += 1
                 yield item
 
-            self.next_pagination_key = result.next_pagination_key
+    def close(self):
+        """
+        Stop the threads fetching the following pages ahead (see prefetch of the query).
+        Unless every object was read, the objects read so far are dropped
+        and iterating it again starts from the first page.
+        """
+        for prefetcher in list(self._prefetchers):
+            prefetcher.close()
+        self._source = None
+        if not self._finished:
+            self._cache_results = []
+
+    def _pages(self, helper=None):
+        helper = helper or self.request_helper
+        size = self.request_helper._prefetch
+        if not size:
+            return self._fetch_pages(helper)
+
+        # the thread does not reference this result, so dropping it stops the thread
+        pages = prefetch(_following_pages(helper, self.next_pagination_key), size)
+        self._prefetchers.add(pages)
+        return chain([self], pages)
+
+    def _apages(self, helper=None):
+        pages = self._afetch_pages(helper)
+        if self.request_helper._prefetch:
+            pages = aprefetch(pages, self.request_helper._prefetch)
+        return pages
+
+    def _fetch_pages(self, helper=None):
+        """
+        this page and the following ones, requested with a clone of helper
+        """
+        helper = helper or self.request_helper
+        yield self
+        yield from _following_pages(helper, self.next_pagination_key)
 
-        self._finished = True
+    async def _afetch_pages(self, helper=None):
+        helper = helper or self.request_helper
+        page = self
+        yield page
+
+        while page.next_pagination_key:
+            page = await helper.clone().pagination_key(page.next_pagination_key).request()
+            yield page
+
+    def iter_pages(self):
+        """
+        yield each page as a list of objects.
+        pages are not cached, so memory use does not grow with the bucket size.
+        """
+        return self._select_pages(self._pages())
+
+    def aiter_pages(self):
+        return self._aselect_pages(self._apages())
+
+    def stream(self):
+        """
+        yield objects page by page without caching them.
+        len(), indexing and a second iteration are not available on the stream.
+        """
+        return self._select(self._pages())
+
+    def astream(self):
+        return self._aselect(self._apages())
+
+    def to_columns(self, fields=None, *, use_numpy=True):
+        """
+        {field: column} of the matched objects, built page by page
+        without caching ObjectResult objects.
+
+        fields: The fields to collect. Every field found when None.
+                A missing value is None, or NaN in a numeric column.
+        use_numpy: Build NumPy arrays when NumPy is installed, and convert
+                   _created and _modified to datetime64[ms].
+                   Otherwise columns are array.array for numbers and list for
+                   other values, and timestamps stay in epoch milliseconds.
+        """
+        columns = ColumnsBuilder(fields)
+        for items in self._select_pages(self._pages(self._dict_helper())):
+            columns.extend(items)
+        return columns.build(use_numpy)
+
+    async def ato_columns(self, fields=None, *, use_numpy=True):
+        columns = ColumnsBuilder(fields)
+        async for items in self._aselect_pages(self._apages(self._dict_helper())):
+            columns.extend(items)
+        return columns.build(use_numpy)
+
+    def to_arrays(self, fields, *, use_numpy=True):
+        """
+        the columns of fields in the same order. see to_columns.
+        """
+        columns = self.to_columns(fields, use_numpy=use_numpy)
+        return tuple(columns[field] for field in fields)
+
+    async def ato_arrays(self, fields, *, use_numpy=True):
+        columns = await self.ato_columns(fields, use_numpy=use_numpy)
+        return tuple(columns[field] for field in fields)
+
+    def _dict_helper(self):
+        # the following pages are decoded into plain dicts only
+        return self.request_helper.clone().as_dicts()
 
     def json(self):
-        return [item.json() for item in self]
+        return [item if isinstance(item, dict) else item.json() for item in self]
 
     def __str__(self):
         return json.dumps(self.json())
 
+    def _item_factory(self):
+        """
+        build an item of the page in the form chosen by QueryForObjects
+        """
+        helper = self.request_helper
+        item_type = getattr(helper, '_item_type', 'object')
+        if item_type == 'dict':
+            return lambda result: result
+        if item_type == 'record':
+            return lambda result: ObjectRecord(helper.scope, result)
+        return lambda result: ObjectResult(helper, self.response).set_result(result)
+
     def set_result(self, result):
+        self._result = result
+        item = self._item_factory()
         self._items = []
         if isinstance(result['results'], list):
-            self._items.extend([
-                ObjectResult(self.request_helper,
-                             self.response).set_result(r) for r in result['results']
-            ])
+            self._items.extend([item(r) for r in result['results']])
         else:
-            self._items.append(ObjectResult(self.request_helper,
-                                            self.response).set_result(result['results']))
+            self._items.append(item(result['results']))
 
         self.next_pagination_key = result.get('nextPaginationKey', None)
         self.query_description = result.get('queryDescription', None)
+
+
+def _following_pages(helper, pagination_key):
+    """
+    the pages from pagination_key, requested with a clone of helper
+    """
+    while pagination_key:
+        page = helper.clone().pagination_key(pagination_key).request()
+        yield page
+        pagination_key = page.next_pagination_key
@@ -0,0 +1,154 @@
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import random
+import threading
+
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+
+
+class RetryStats:
+    """
+    Thread-safe counters of a RetryPolicy.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.retries = 0
+        self.exhausted = 0
+        self.reasons = Counter()
+
+    def record_attempt(self):
+        with self._lock:
+            self.attempts += 1
+
+    def record_retry(self, reason):
+        with self._lock:
+            self.retries += 1
+            self.reasons[reason] += 1
+
+    def record_exhausted(self):
+        with self._lock:
+            self.exhausted += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'attempts': self.attempts,
+                'retries': self.retries,
+                'exhausted': self.exhausted,
+                'reasons': dict(self.reasons),
+            }
+
+
+class RetryPolicy:
+    """
+    Retry transient errors with exponential backoff.
+
+    max_attempts: The number of attempts including the first one
+    backoff: The delay in seconds before the first retry
+    multiplier: The factor applied to the delay after every retry
+    max_backoff: The upper bound of a delay in seconds
+    jitter: Randomize each delay between 0 and the computed delay ("full jitter")
+    statuses: Status codes retried for idempotent requests
+    unprocessed_statuses: Status codes which mean the server did not process the request,
+                          so they are retried for non-idempotent requests as well
+    respect_retry_after: Wait as long as the Retry-After header asks, up to max_backoff
+
+    A request is idempotent when its helper has idempotent = True,
+    or when its HTTP method is idempotent and the helper does not say otherwise.
+    Streamed request bodies (file objects, iterators) are never replayed.
+    """
+    def __init__(self,
+                 *,
+                 max_attempts=3,
+                 backoff=0.5,
+                 multiplier=2,
+                 max_backoff=30,
+                 jitter=True,
+                 statuses=(500, 502, 503, 504),
+                 unprocessed_statuses=(429,),
+                 respect_retry_after=True):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.unprocessed_statuses = frozenset(unprocessed_statuses)
+        self.respect_retry_after = respect_retry_after
+        self.stats = RetryStats()
+
+    def is_idempotent(self, helper):
+        idempotent = getattr(helper, 'idempotent', None)
+        if idempotent is not None:
+            return idempotent
+        return helper.method in IDEMPOTENT_METHODS
+
+    def is_replayable(self, kwargs):
+        data = kwargs.get('data')
+        return data is None or isinstance(data, (str, bytes, bytearray, memoryview, dict))
+
+    def retry_status(self, helper, attempt, status_code, kwargs):
+        """
+        reason to retry a response, or None
+        """
+        if attempt >= self.max_attempts or not self.is_replayable(kwargs):
+            return None
+
+        if status_code in self.unprocessed_statuses:
+            return status_code
+
+        if status_code in self.statuses and self.is_idempotent(helper):
+            return status_code
+
+        return None
+
+    def retry_error(self, helper, attempt, error, kwargs, *, sent=True):
+        """
+        reason to retry a connection error, or None.
+        sent is False when the request is known not to have reached the server.
+        """
+        if attempt >= self.max_attempts or not self.is_replayable(kwargs):
+            return None
+
+        if not sent or self.is_idempotent(helper):
+            return error.__class__.__name__
+
+        return None
+
+    def delay(self, attempt, response=None):
+        delay = min(self.backoff * self.multiplier ** (attempt - 1), self.max_backoff)
+
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        if self.respect_retry_after and response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                delay = min(max(delay, retry_after), self.max_backoff)
+
+        return delay
+
+
+def parse_retry_after(value):
+    """
+    seconds to wait from a Retry-After header (delta-seconds or HTTP-date)
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0)
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import logging
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class Transport:
+    """
+    Connection-pooled HTTP transport shared by every request helper of a KiiAPI.
+
+    pool_connections: The number of per-host connection pools to cache
+    pool_maxsize: The maximum number of connections kept alive per host
+    pool_block: Block when no free connection is available instead of
+                opening a throwaway one
+    keep_alive: Reuse connections between API calls
+    """
+    is_async = False
+
+    def __init__(self,
+                 *,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 pool_block=False,
+                 keep_alive=True):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def send(self, helper, **kwargs):
+        url = helper.url
+        headers = helper.headers
+        logger.debug('METHOD:%s URL:%s HEADERS:%s KWARGS:%s',
+                     helper.method, url, headers, kwargs)
+        retry = helper.api.retry
+        rate_limiter = helper.api.rate_limiter
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if retry is not None:
+                retry.stats.record_attempt()
+            if rate_limiter is not None:
+                rate_limiter.acquire(helper)
+
+            try:
+                response = self.request(helper.method, url, headers=headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                sent = not self._connect_failed(e)
+                reason = retry and retry.retry_error(helper, attempt, e, kwargs, sent=sent)
+                if not reason:
+                    self._give_up(retry, attempt)
+                    raise
+                delay = retry.delay(attempt)
+            else:
+                reason = retry and retry.retry_status(helper, attempt,
+                                                      response.status_code, kwargs)
+                if not reason:
+                    if response.status_code >= 400:
+                        self._give_up(retry, attempt)
+                    return helper.process_response(response)
+                delay = retry.delay(attempt, response)
+                response.close()
+
+            self._log_retry(retry, helper, url, attempt, reason, delay)
+            time.sleep(delay)
+
+    @staticmethod
+    def _connect_failed(error):
+        # the request never left the client, so even a POST may be replayed
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def _give_up(self, retry, attempt):
+        if retry is not None and attempt >= retry.max_attempts > 1:
+            retry.stats.record_exhausted()
+
+    def _log_retry(self, retry, helper, url, attempt, reason, delay):
+        retry.stats.record_retry(reason)
+        logger.warning('retrying %s %s in %.2fs (attempt %d of %d): %s',
+                       helper.method, url, delay, attempt + 1, retry.max_attempts, reason)
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncResponse:
+    """
+    Fully read aiohttp response exposing the parts of requests.Response
+    that result containers and KiiAPIError rely on.
+    """
+    def __init__(self, response, content):
+        self.status_code = response.status
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.encoding = response.get_encoding() if content else 'utf-8'
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncTransport(Transport):
+    """
+    aiohttp based transport. Every request helper of an AsyncKiiAPI
+    returns an awaitable from request().
+
+    pool_block: aiohttp always waits for a free connection once
+                pool_connections * pool_maxsize (pool_maxsize per host) are open,
+                so it cannot be False
+    """
+    is_async = True
+
+    def __init__(self,
+                 *,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 pool_block=True,
+                 keep_alive=True):
+        if aiohttp is None:
+            raise ImportError('AsyncTransport requires aiohttp. '
+                              'Install python3-kii[async].')
+        if not pool_block:
+            raise ValueError('AsyncTransport always waits for a free connection. '
+                             'Raise pool_maxsize instead of passing pool_block=False.')
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.session = None
+        self._loop = None
+
+    def __enter__(self):
+        raise TypeError('AsyncTransport is closed asynchronously. Use "async with" instead.')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        raise TypeError('AsyncTransport is closed asynchronously. Use "async with" instead.')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _session(self):
+        # aiohttp binds a session to the running event loop, so it is built
+        # on the first request of each loop instead of in __init__.
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self._loop is not loop:
+            if self.session is not None and not self.session.closed:
+                # the session of a previous loop. When that loop is already
+                # closed, aiohttp only drops its connections.
+                await self.session.close()
+            self._loop = loop
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_connections * self.pool_maxsize,
+                limit_per_host=self.pool_maxsize,
+                force_close=not self.keep_alive)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def send(self, helper, **kwargs):
+        url = helper.url
+        headers = helper.headers
+        logger.debug('METHOD:%s URL:%s HEADERS:%s KWARGS:%s',
+                     helper.method, url, headers, kwargs)
+        retry = helper.api.retry
+        rate_limiter = helper.api.rate_limiter
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if retry is not None:
+                retry.stats.record_attempt()
+            if rate_limiter is not None:
+                await rate_limiter.aacquire(helper)
+
+            try:
+                response = await self.request(helper.method, url, headers=headers, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                sent = not isinstance(e, aiohttp.ClientConnectorError)
+                reason = retry and retry.retry_error(helper, attempt, e, kwargs, sent=sent)
+                if not reason:
+                    self._give_up(retry, attempt)
+                    raise
+                delay = retry.delay(attempt)
+            else:
+                reason = retry and retry.retry_status(helper, attempt,
+                                                      response.status_code, kwargs)
+                if not reason:
+                    if response.status_code >= 400:
+                        self._give_up(retry, attempt)
+                    return helper.process_response(response)
+                delay = retry.delay(attempt, response)
+
+            self._log_retry(retry, helper, url, attempt, reason, delay)
+            await asyncio.sleep(delay)
+
+    async def request(self, method, url, **kwargs):
+        session = await self._session()
+        async with session.request(method, url, **kwargs) as response:
+            content = await response.read()
+            return AsyncResponse(response, content)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
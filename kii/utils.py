@@ -1,3 +1,17 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import heapq
+import io
+import json
+import mmap
+import os
+import queue
+import stat
+import tempfile
+import threading
+
 from kii import exceptions as exc
 
 
@@ -5,9 +19,365 @@ class Accessor:
     def __init__(self, scope):
         self.scope = scope
 
+    def implements(self, name):
+        return hasattr(self.scope, name)
+
     def __getattr__(self, name):
         try:
             return getattr(self.scope, name)
         except AttributeError as e:
             raise exc.KiiNotImplementedError(
                 '{0} is not implemented in {1} scope.'.format(name, self.scope)) from e
+
+
+def as_memoryview(body):
+    """
+    zero-copy byte view of bytes-like objects. str is encoded as UTF-8.
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return memoryview(body).cast('B')
+
+
+@contextmanager
+def body_view(body):
+    """
+    Random-access byte view of an upload body without loading it into memory.
+
+    bytes-like and str: used as is
+    os.PathLike and regular files: memory-mapped
+    io.BytesIO: its buffer, released afterwards so the BytesIO can be written again
+    other file objects and iterables of bytes: spooled to a temporary file,
+                                               then memory-mapped.
+                                               Every piece carries the total size,
+                                               so they are read to the end first.
+    """
+    opened = []
+    views = []
+    try:
+        if isinstance(body, (str, bytes, bytearray, memoryview)):
+            yield as_memoryview(body)
+            return
+
+        if isinstance(body, os.PathLike):
+            body = open(body, 'rb')
+            opened.append(body)
+
+        if isinstance(body, io.BytesIO):
+            views.append(body.getbuffer())
+            views.append(views[-1][body.tell():])
+            yield views[-1]
+            return
+
+        if not _is_mappable(body):
+            spool = tempfile.TemporaryFile()
+            opened.append(spool)
+            chunks = iter(lambda: body.read(io.DEFAULT_BUFFER_SIZE), b'') \
+                if hasattr(body, 'read') else body
+            for chunk in chunks:
+                spool.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            spool.flush()
+            spool.seek(0)
+            body = spool
+
+        offset = body.tell()
+        if os.fstat(body.fileno()).st_size <= offset:
+            yield memoryview(b'')
+            return
+
+        mapped = mmap.mmap(body.fileno(), 0, access=mmap.ACCESS_READ)
+        opened.append(mapped)
+        views.append(memoryview(mapped))
+        views.append(views[-1][offset:])
+        yield views[-1]
+    finally:
+        for view in reversed(views):
+            view.release()
+        for resource in reversed(opened):
+            try:
+                resource.close()
+            except BufferError:
+                # a piece is still referenced. the map is released by GC.
+                pass
+
+
+def save_json(path, data):
+    """
+    write data as JSON through a temporary file, so path never holds a partial write
+    """
+    temp = '{0}.tmp'.format(os.fspath(path))
+    with open(temp, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp, path)
+
+
+def _is_mappable(body):
+    try:
+        return stat.S_ISREG(os.fstat(body.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+_DONE = object()
+
+
+def prefetch(iterable, size):
+    """
+    Iterate in a background thread, staying at most size items ahead of the caller.
+    """
+    return interleave([iterable], size)
+
+
+def interleave(iterables, size):
+    """
+    Iterate over each iterable in its own thread and yield the items as they arrive.
+    At most size items are fetched or buffered ahead of the caller.
+    """
+    return Interleaved(iterables, size)
+
+
+class Interleaved:
+    """
+    Iterator of interleave(). close() stops its threads.
+    The threads do not reference it, so dropping it stops them too.
+    """
+    def __init__(self, iterables, size):
+        self._iterables = list(iterables)
+        self._buffer = queue.Queue()
+        self._slots = threading.Semaphore(max(size, 1))
+        self._stop = threading.Event()
+        self._workers = None
+        self._running = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._workers is None:
+            self._start()
+
+        while self._running:
+            item, error = self._buffer.get()
+            if error is not None:
+                self._running = 0
+                self._stop.set()
+                raise error
+            if item is _DONE:
+                self._running -= 1
+                continue
+            self._slots.release()
+            return item
+        raise StopIteration
+
+    def _start(self):
+        self._workers = [
+            threading.Thread(target=_produce,
+                             args=(iterable, self._buffer, self._slots, self._stop),
+                             daemon=True)
+            for iterable in self._iterables]
+        self._iterables = None
+        self._running = len(self._workers)
+        for worker in self._workers:
+            worker.start()
+
+    def close(self):
+        """
+        stop the threads and wait for the items they are fetching
+        """
+        self._stop.set()
+        for worker in self._workers or ():
+            worker.join()
+
+    def __del__(self):
+        self._stop.set()
+
+
+def _produce(iterable, buffer, slots, stop):
+    def reserve():
+        # a slot is taken before an item is fetched and given back when the caller gets it
+        while not stop.is_set():
+            if slots.acquire(timeout=0.1):
+                return True
+        return False
+
+    try:
+        iterator = iter(iterable)
+        while reserve():
+            item = next(iterator, _DONE)
+            if item is _DONE:
+                slots.release()
+                break
+            buffer.put((item, None))
+        buffer.put((_DONE, None))
+    except BaseException as e:
+        buffer.put((_DONE, e))
+
+
+def aprefetch(iterable, size):
+    """
+    asyncio version of prefetch for async iterables.
+    """
+    return ainterleave([iterable], size)
+
+
+async def ainterleave(iterables, size):
+    """
+    asyncio version of interleave for async iterables.
+    """
+    buffer = asyncio.Queue()
+    # a slot is taken before an item is fetched and given back when the caller gets it
+    slots = asyncio.Semaphore(max(size, 1))
+
+    async def produce(iterable):
+        try:
+            iterator = iterable.__aiter__()
+            while True:
+                await slots.acquire()
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    slots.release()
+                    break
+                buffer.put_nowait((item, None))
+            buffer.put_nowait((_DONE, None))
+        except Exception as e:
+            buffer.put_nowait((_DONE, e))
+
+    workers = [asyncio.ensure_future(produce(iterable)) for iterable in iterables]
+
+    try:
+        running = len(workers)
+        while running:
+            item, error = await buffer.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                running -= 1
+                continue
+            slots.release()
+            yield item
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+
+class _Reversed:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+async def amerge(iterables, key, reverse=False):
+    """
+    asyncio version of heapq.merge for async iterables.
+    """
+    def sort_key(item):
+        return _Reversed(key(item)) if reverse else key(item)
+
+    heap = []
+    for index, iterable in enumerate(iterables):
+        iterator = iterable.__aiter__()
+        try:
+            item = await iterator.__anext__()
+        except StopAsyncIteration:
+            continue
+        heap.append([sort_key(item), index, item, iterator])
+    heapq.heapify(heap)
+
+    while heap:
+        entry = heap[0]
+        yield entry[2]
+        try:
+            item = await entry[3].__anext__()
+        except StopAsyncIteration:
+            heapq.heappop(heap)
+            continue
+        entry[0], entry[2] = sort_key(item), item
+        heapq.heapreplace(heap, entry)
+
+
+def bounded_map(fn, iterable, concurrency):
+    """
+    map() over a thread pool. Results are yielded in input order and at most
+    2 * concurrency items are taken from the iterable ahead of the caller.
+    """
+    if concurrency <= 1:
+        yield from map(fn, iterable)
+        return
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        pending = deque()
+        try:
+            for item in iterable:
+                pending.append(executor.submit(fn, item))
+                if len(pending) >= concurrency * 2:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def abounded_map(fn, iterable, concurrency):
+    """
+    asyncio version of bounded_map for a coroutine function, returning a list.
+    see abounded_imap.
+    """
+    return [result async for result in abounded_imap(fn, iterable, concurrency)]
+
+
+async def abounded_imap(fn, iterable, concurrency):
+    """
+    async generator version of abounded_map. Results are yielded in input order,
+    at most 2 * concurrency items are taken ahead of the caller and
+    iterable may also be an async iterable.
+    The first error cancels the other tasks and waits for them before it is raised.
+    """
+    concurrency = max(concurrency, 1)
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = deque()
+
+    async def run(item):
+        async with semaphore:
+            return await fn(item)
+
+    async def items():
+        if hasattr(iterable, '__aiter__'):
+            async for item in iterable:
+                yield item
+        else:
+            for item in iterable:
+                yield item
+
+    async def first():
+        # the result of the oldest task, or the error of any task as soon as it fails
+        head = pending[0]
+        while not head.done():
+            done, _ = await asyncio.wait([task for task in pending if not task.done()],
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        return pending.popleft().result()
+
+    try:
+        async for item in items():
+            pending.append(asyncio.ensure_future(run(item)))
+            if len(pending) >= concurrency * 2:
+                yield await first()
+
+        while pending:
+            yield await first()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
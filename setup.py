@@ -43,7 +43,14 @@ setup(name='python3-kii',
       url='',
       keywords='web kii baas api',
       license='MIT',
+      python_requires='>=3.7',
       install_requires=requires,
+      extras_require={
+          'async': ['aiohttp'],
+          'fast': ['orjson'],
+          'numpy': ['numpy'],
+          'zstd': ['zstandard'],
+      },
       tests_require=requires + ['pytest'],
       test_suite='tests',
       cmdclass={'test': PyTest})
@@ -2,7 +2,7 @@ import os
 import os.path
 from configparser import ConfigParser
 
-from kii import KiiAPI, KiiAdminAPI, Site
+from kii import AsyncKiiAPI, KiiAPI, KiiAdminAPI, Site
 from kii import exceptions as exc
 
 
@@ -30,6 +30,15 @@ def get_api_with_test_user():
     return api.clone(access_token=test_user.access_token)
 
 
+def get_async_api_with_test_user():
+    env = get_env()
+    api = AsyncKiiAPI(env['kii_info']['app_id'],
+                      env['kii_info']['app_key'],
+                      region=Site[env['location']['region']])
+    test_user = get_test_user()
+    return api.clone(access_token=test_user.access_token)
+
+
 def get_admin_api():
     env = get_env()
     api = KiiAdminAPI(
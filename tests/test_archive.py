@@ -0,0 +1,47 @@
+import pytest
+
+from kii.archive import ArchiveWriter, ExportState, detect_compression, read_archive
+
+
+class TestArchive:
+    def test_detect_compression(self):
+        assert detect_compression('bucket.ndjson') is None
+        assert detect_compression('bucket.ndjson.gz') == 'gzip'
+        assert detect_compression('bucket.ndjson', 'gzip') == 'gzip'
+        with pytest.raises(ValueError):
+            detect_compression('bucket.ndjson', 'bz2')
+
+    @pytest.mark.parametrize('name', ['bucket.ndjson', 'bucket.ndjson.gz'])
+    def test_round_trip(self, tmp_path, name):
+        path = tmp_path / name
+        with ArchiveWriter(path) as archive:
+            archive.write_page([{'_id': 'a', 'name': 'é'}, {'_id': 'b'}])
+            archive.write_page([])
+            archive.write_page([{'_id': 'c'}])
+
+        assert [obj['_id'] for obj in read_archive(path)] == ['a', 'b', 'c']
+
+    @pytest.mark.parametrize('name', ['bucket.ndjson', 'bucket.ndjson.gz'])
+    def test_resume_drops_pages_after_offset(self, tmp_path, name):
+        path = tmp_path / name
+        with ArchiveWriter(path) as archive:
+            offset = archive.write_page([{'_id': 'a'}])
+            archive.write_page([{'_id': 'lost'}])
+
+        with ArchiveWriter(path, offset=offset) as archive:
+            archive.write_page([{'_id': 'b'}])
+
+        assert [obj['_id'] for obj in read_archive(path)] == ['a', 'b']
+
+    def test_state(self, tmp_path):
+        path = tmp_path / 'bucket.ndjson'
+        state = ExportState(path)
+        assert not state.load()
+
+        state.save('key', 10, 2)
+        loaded = ExportState(path)
+        assert loaded.load()
+        assert (loaded.pagination_key, loaded.offset, loaded.exported) == ('key', 10, 2)
+
+        loaded.remove()
+        assert not ExportState(path).load()
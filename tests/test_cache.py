@@ -0,0 +1,68 @@
+import time
+
+from kii import KiiAPI
+from kii.cache import LRUCache, QueryCache
+
+
+class TestLRUCache:
+    def test_lru(self):
+        cache = LRUCache(maxsize=2, ttl=None)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.evictions == 1
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=0.05)
+        cache.set('a', 1)
+        assert cache.lookup('a') == (1, True)
+
+        time.sleep(0.06)
+        assert cache.lookup('a') == (1, False)
+        assert cache.get('a') is None
+
+        cache.touch('a')
+        assert cache.get('a') == 1
+
+    def test_invalidate(self):
+        cache = LRUCache()
+        cache.set('a', 1)
+        cache.invalidate('a')
+        cache.invalidate('missing')
+        assert cache.lookup('a') is None
+        assert len(cache) == 0
+
+
+class TestQueryCache:
+    def test_key(self):
+        cache = QueryCache()
+        key = cache.key('url', 'token', {'a': 1, 'b': [1, 2]})
+        assert key == cache.key('url', 'token', {'b': [1, 2], 'a': 1})
+        assert key != cache.key('url', 'other', {'a': 1, 'b': [1, 2]})
+        assert key != cache.key('url', 'token', {'a': 1, 'b': [2, 1]})
+
+    def test_invalidate_bucket(self):
+        cache = QueryCache()
+        key = cache.key('url', 'token', {})
+        other = cache.key('other', 'token', {})
+        cache.set(key, 1)
+        cache.set(other, 2)
+
+        cache.invalidate_bucket('url')
+        assert cache.get(cache.key('url', 'token', {})) is None
+        assert cache.get(cache.key('other', 'token', {})) == 2
+
+
+class TestScopeCache:
+    def test_invalidate_without_helpers(self):
+        api = KiiAPI('app_id', 'app_key', access_token='token')
+        group = api.data.group.enable_object_cache().enable_query_cache()
+        group('group_id', 'bucket')._invalidate('object_id')
+
+        user = api.data.user.enable_object_cache().enable_query_cache()
+        user('bucket')._invalidate('object_id')
@@ -0,0 +1,124 @@
+import json
+
+from kii.data import clauses as cl
+from kii.data.application import QueryForObjects
+
+
+class Scope:
+    bucket_id = 'test_bucket'
+    query_cache = None
+
+    class api:
+        app_id = 'app'
+        endpoint_url = 'http://localhost'
+
+
+def normalized(clause):
+    return cl.normalize(clause).query()
+
+
+class TestNormalize:
+    def test_flatten_and(self):
+        clause = cl.AndClause(cl.AndClause(cl.EqualClause('a', 1), cl.AllClause()),
+                              cl.AndClause(cl.EqualClause('b', 2)),
+                              cl.EqualClause('a', 1))
+        assert normalized(clause) == cl.AndClause(cl.EqualClause('a', 1),
+                                                  cl.EqualClause('b', 2)).query()
+        assert len(clause.children) == 3
+
+    def test_merge_equals_in_or(self):
+        clause = cl.OrClause(cl.EqualClause('a', 1),
+                             cl.OrClause(cl.EqualClause('a', 2), cl.InClause('a', [2, 3])),
+                             cl.EqualClause('b', 1))
+        assert normalized(clause) == cl.OrClause(cl.InClause('a', [1, 2, 3]),
+                                                 cl.EqualClause('b', 1)).query()
+
+    def test_all(self):
+        assert normalized(cl.AndClause(cl.AllClause())) == {'type': 'all'}
+        assert normalized(cl.OrClause(cl.EqualClause('a', 1), cl.AllClause())) == {'type': 'all'}
+        assert normalized(cl.AndClause(cl.AllClause(), cl.EqualClause('a', 1))) == \
+            cl.EqualClause('a', 1).query()
+
+    def test_not(self):
+        clause = cl.NotClause(cl.NotClause(cl.EqualClause('a', 1)))
+        assert normalized(clause) == cl.EqualClause('a', 1).query()
+
+
+class TestCompiledQuery:
+    def test_filter_is_flat(self):
+        query = QueryForObjects(Scope(), cl.EqualClause('a', 1))
+        query = query.filter(cl.EqualClause('b', 2)).filter(cl.EqualClause('c', 3))
+        assert len(query.clause.children) == 3
+
+        query = QueryForObjects(Scope()).filter(cl.EqualClause('a', 1))
+        assert isinstance(query.clause, cl.EqualClause)
+
+    def test_payload(self):
+        query = QueryForObjects(Scope(), cl.OrClause(cl.EqualClause('a', 1),
+                                                     cl.EqualClause('a', 2)))
+        query.order_by('a', False).best_effort_limit(10)
+        assert json.loads(query._payload()) == query._assemble()
+
+        page = query.clone().pagination_key('next')
+        assert page._compiled is query._compiled
+        assert json.loads(page._payload()) == dict(query._assemble(), paginationKey='next')
+
+    def test_compiled_query_is_rebuilt(self):
+        query = QueryForObjects(Scope())
+        query._payload()
+        query.order_by('a')
+        assert json.loads(query._payload())['bucketQuery']['orderBy'] == 'a'
+
+        query.clause = cl.EqualClause('a', 1)
+        assert json.loads(query._payload())['bucketQuery']['clause']['type'] == 'eq'
+
+        # a clause modified in place
+        query.clause = cl.AndClause(cl.EqualClause('a', 1))
+        query._payload()
+        query.clause.add(cl.EqualClause('b', 2))
+        assert json.loads(query._payload())['bucketQuery']['clause'] == \
+            cl.AndClause(cl.EqualClause('a', 1), cl.EqualClause('b', 2)).query()
+
+        # a nested clause modified in place
+        query.clause.add(cl.RangeClause('c').ge(1))
+        page = query.clone().pagination_key('next')
+        page._payload()
+        query.clause.children[-1].ge(5)
+        clause = json.loads(page._payload())['bucketQuery']['clause']
+        assert clause['clauses'][-1]['lowerLimit'] == 5
+
+        # a clone does not keep the aggregations of count()
+        query._aggregations = [{'type': 'COUNT', 'putAggregationInto': 'count_field'}]
+        query._compiled = None
+        assert 'aggregations' in json.loads(query._payload())['bucketQuery']
+        assert 'aggregations' not in json.loads(query.clone()._payload())['bucketQuery']
+
+
+class TestSplit:
+    def test_small_clause(self):
+        clause = cl.InClause('a', [1, 2])
+        assert [c.query() for c in cl.split(clause, 2)] == [clause.query()]
+
+    def test_in(self):
+        clauses = cl.split(cl.InClause('a', range(5)), 2)
+        assert [c.values for c in clauses] == [[0, 1], [2, 3], [4]]
+
+    def test_or(self):
+        clause = cl.OrClause(cl.EqualClause('a', 1), cl.EqualClause('a', 2),
+                             cl.PrefixClause('b', 'x'), cl.InClause('c', [1, 2, 3]))
+        assert [c.query() for c in cl.split(clause, 2)] == [
+            cl.InClause('a', [1, 2]).query(),
+            cl.OrClause(cl.PrefixClause('b', 'x'), cl.InClause('c', [1])).query(),
+            cl.InClause('c', [2, 3]).query(),
+        ]
+
+    def test_and(self):
+        clause = cl.AndClause(cl.EqualClause('a', 1), cl.InClause('b', [1, 2, 3]))
+        assert [c.query() for c in cl.split(clause, 2)] == [
+            cl.AndClause(cl.EqualClause('a', 1), cl.InClause('b', [1, 2])).query(),
+            cl.AndClause(cl.EqualClause('a', 1), cl.InClause('b', [3])).query(),
+        ]
+
+    def test_not_is_not_split(self):
+        clause = cl.NotClause(cl.InClause('a', [1, 2, 3]))
+        assert [c.query() for c in cl.split(clause, 2)] == [clause.query()]
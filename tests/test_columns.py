@@ -0,0 +1,42 @@
+from array import array
+import math
+
+from kii.results.columns import ColumnBuilder, ColumnsBuilder
+
+
+def build(values):
+    column = ColumnBuilder()
+    for value in values:
+        column.append(value)
+    return column.build(use_numpy=False)
+
+
+class TestColumns:
+    def test_ints(self):
+        assert build([1, 2, 3]) == array('q', [1, 2, 3])
+
+    def test_missing_int_becomes_nan(self):
+        column = build([None, 1, 2])
+        assert column.typecode == 'd'
+        assert math.isnan(column[0])
+        assert list(column[1:]) == [1, 2]
+
+    def test_mixed_falls_back_to_list(self):
+        assert build([1, 2.5, 'x', None]) == [1, 2.5, 'x', None]
+        assert build([True, False]) == [True, False]
+        assert build([1, 2 ** 70]) == [1, 2 ** 70]
+
+    def test_discovered_fields(self):
+        columns = ColumnsBuilder()
+        columns.append({'a': 'x'})
+        columns.append({'a': 'y', 'b': 'z'})
+        assert columns.build(use_numpy=False) == {'a': ['x', 'y'], 'b': [None, 'z']}
+
+    def test_fixed_fields(self):
+        columns = ColumnsBuilder(['b'])
+        columns.append({'a': 1})
+        columns.append({'a': 2, 'b': 3})
+        result = columns.build(use_numpy=False)
+        assert list(result) == ['b']
+        assert math.isnan(result['b'][0])
+        assert result['b'][1] == 3
@@ -0,0 +1,25 @@
+from kii.results import QueryCursor
+
+
+class TestQueryCursor:
+    def test_json(self):
+        cursor = QueryCursor('key', offset=3, count=10)
+        assert cursor.json() == {'paginationKey': 'key', 'offset': 3, 'count': 10, 'done': False}
+        assert QueryCursor.from_json(cursor.json()) == cursor
+        assert QueryCursor.from_json({}) == QueryCursor()
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / 'cursor.json'
+        assert QueryCursor.load(path) is None
+
+        cursor = QueryCursor('key', count=5, done=True)
+        cursor.save(path)
+        assert QueryCursor.load(path) == cursor
+        assert not (tmp_path / 'cursor.json.tmp').exists()
+
+    def test_copy(self):
+        cursor = QueryCursor('key')
+        copied = cursor.copy()
+        copied.count += 1
+        assert cursor.count == 0
+        assert copied == QueryCursor('key', count=1)
@@ -0,0 +1,151 @@
+'''
+Precondition
+    successfully pass a users test.
+'''
+import asyncio
+
+import pytest
+
+from kii import exceptions as exc, results as rs
+from kii.data import clauses as cl
+
+from tests.conf import (
+    get_async_api_with_test_user,
+    cleanup,
+)
+
+
+BUCKET_ID = 'test_bucket'
+
+
+class TestApplicationAsync:
+    def setup_method(self, method):
+        """ setup any state tied to the execution of the given method in a
+        class.  setup_method is invoked for every test method of a class.
+        """
+        cleanup()
+        self.api = get_async_api_with_test_user()
+        self.OBJ_COUNT = 5
+
+    def teardown_method(self, method):
+        """ teardown any state that was previously setup with a setup_method
+        call.
+        """
+        async def delete_bucket():
+            try:
+                await self.api.data.application.delete_a_bucket(BUCKET_ID)
+            except exc.KiiBucketNotFoundError:
+                pass
+            await self.api.close()
+
+        asyncio.run(delete_bucket())
+        cleanup()
+
+    def run(self, coro):
+        return asyncio.run(coro)
+
+    def test_create_and_retrieve_an_object(self):
+        async def scenario():
+            bucket = self.api.data.application(BUCKET_ID)
+            created = await bucket.create_an_object({'index': 1})
+            assert isinstance(created, rs.CreateResult)
+
+            obj = await bucket.retrieve_an_object(created.object_id)
+            assert isinstance(obj, rs.ObjectResult)
+            assert obj['index'] == 1
+
+            await bucket.delete_an_object(created.object_id)
+            with pytest.raises(exc.KiiObjectNotFoundError):
+                await bucket.retrieve_an_object(created.object_id)
+
+        self.run(scenario())
+
+    def test_object_cache(self):
+        async def scenario():
+            scope = self.api.data.application
+            bucket = scope.enable_object_cache(maxsize=10, ttl=60)(BUCKET_ID)
+            created = await bucket.create_an_object({'index': 1})
+
+            obj = await bucket.retrieve_an_object(created.object_id)
+            assert obj['index'] == 1
+
+            # a fresh hit is served without a request
+            obj = await bucket.retrieve_an_object(created.object_id)
+            assert obj['index'] == 1
+            assert bucket.object_cache.hits == 1
+
+            objects = await bucket.retrieve_objects([created.object_id], by_query=False)
+            assert objects[created.object_id]['index'] == 1
+
+            # revalidated with If-None-Match
+            bucket = scope.enable_object_cache(maxsize=10, ttl=0)(BUCKET_ID)
+            await bucket.retrieve_an_object(created.object_id)
+            obj = await bucket.retrieve_an_object(created.object_id)
+            assert obj['index'] == 1
+            assert bucket.object_cache.revalidations == 1
+
+            scope.disable_object_cache()
+
+        self.run(scenario())
+
+    def test_query(self):
+        async def scenario():
+            bucket = self.api.data.application(BUCKET_ID)
+            for i in range(self.OBJ_COUNT):
+                await bucket.create_an_object({'index': i})
+
+            results = await bucket.query().best_effort_limit(2).order_by('index', False).all()
+            indexes = [r['index'] async for r in results]
+            assert indexes == list(range(self.OBJ_COUNT))
+
+            results = await bucket.query().best_effort_limit(2).all()
+            with pytest.raises(TypeError):
+                len(results)
+            with pytest.raises(TypeError):
+                results.count
+            with pytest.raises(TypeError):
+                bool(results)
+            assert await results.acount() == self.OBJ_COUNT
+            assert await results.aexists()
+
+            results = await bucket.query().best_effort_limit(2).all()
+            assert await results.aexists()
+            assert await results.acount() == self.OBJ_COUNT
+
+            results = await bucket.query(cl.EqualClause('index', -1)).all()
+            assert not await results.aexists()
+            assert await results.acount() == 0
+
+            assert await bucket.query().count() == self.OBJ_COUNT
+
+            first = await bucket.query().order_by('index', False).first()
+            assert first['index'] == 0
+
+            one = await bucket.query(cl.EqualClause('index', 3)).one()
+            assert one['index'] == 3
+
+            with pytest.raises(exc.KiiMultipleResultsFoundError):
+                await bucket.query().one()
+
+            query = bucket.query(cl.InClause('index', [4, 0, 2])).order_by('index', True)
+            indexes = [r['index'] async for r in query.fan_out(1)]
+            assert indexes == [4, 2, 0]
+
+        self.run(scenario())
+
+    def test_body(self):
+        async def scenario():
+            bucket = self.api.data.application(BUCKET_ID)
+            obj = await bucket.create_an_object({'index': 1})
+
+            assert await bucket.has_body(obj.object_id) is False
+
+            body = b'abcdefghijklmnopqrstuvwxyz'
+            await bucket.upload_body_multiple_pieces(obj.object_id, body, 'text/plain',
+                                                     piece_byte=10)
+            assert await bucket.has_body(obj.object_id) is True
+
+            result = await bucket.retrieve_an_object_body(obj.object_id)
+            assert result.body == body
+
+        self.run(scenario())
@@ -0,0 +1,148 @@
+'''
+Precondition
+    successfully pass a users test.
+'''
+from kii import exceptions as exc, results as rs
+from kii.data import clauses as cl
+
+from tests.conf import (
+    get_api_with_test_user,
+    cleanup,
+)
+
+
+BUCKET_ID = 'test_bucket'
+
+
+class TestApplicationBulk:
+    def setup_method(self, method):
+        """ setup any state tied to the execution of the given method in a
+        class.  setup_method is invoked for every test method of a class.
+        """
+        cleanup()
+        self.api = get_api_with_test_user()
+        self.scope = self.api.data.application
+
+    def teardown_method(self, method):
+        """ teardown any state that was previously setup with a setup_method
+        call.
+        """
+        try:
+            self.scope.delete_a_bucket(BUCKET_ID)
+        except exc.KiiBucketNotFoundError:
+            pass
+        cleanup()
+
+    def test_create_objects(self):
+        bucket = self.scope(BUCKET_ID)
+        params = ({'index': i} for i in range(20))
+
+        summary = bucket.create_objects(params, concurrency=4)
+
+        assert isinstance(summary, rs.BulkResult)
+        assert summary
+        assert summary.total == 20
+        assert summary.succeeded == 20
+        assert summary.failed == 0
+
+        for i, result in enumerate(summary.results):
+            assert isinstance(result, rs.CreateResult)
+            assert bucket.retrieve_an_object(result.object_id)['index'] == i
+
+    def test_create_objects_with_failures(self):
+        bucket = self.scope(BUCKET_ID)
+        params = [{'index': 0}, 'not an object', {'index': 2}]
+
+        summary = bucket.create_objects(params, concurrency=2, keep_results=False)
+
+        assert not summary
+        assert summary.total == 3
+        assert summary.succeeded == 2
+        assert summary.results is None
+
+        index, item, error = summary.errors[0]
+        assert index == 1
+        assert item == 'not an object'
+        assert isinstance(error, exc.KiiAPIError)
+        assert summary.failed_items == ['not an object']
+
+    def test_query_update(self):
+        bucket = self.scope(BUCKET_ID)
+        bucket.create_objects({'index': i, 'even': i % 2 == 0} for i in range(10))
+
+        summary = bucket.query(cl.EqualClause('even', True)).update({'tag': 'even'},
+                                                                    concurrency=4,
+                                                                    if_match=True)
+
+        assert summary.succeeded == 5
+        assert summary.failed == 0
+        assert bucket.query(cl.EqualClause('tag', 'even')).count() == 5
+
+    def test_query_update_of_the_clause_field(self):
+        bucket = self.scope(BUCKET_ID)
+        bucket.create_objects({'index': i, 'even': i % 2 == 0} for i in range(12))
+
+        # updated objects stop matching, so the following pages shift
+        query = bucket.query(cl.EqualClause('even', True)).best_effort_limit(3)
+        summary = query.update({'even': False})
+
+        assert summary.succeeded == 6
+        assert bucket.query(cl.EqualClause('even', True)).count() == 0
+
+    def test_query_delete(self):
+        bucket = self.scope(BUCKET_ID)
+        bucket.create_objects({'index': i, 'even': i % 2 == 0} for i in range(10))
+        progress = []
+
+        summary = bucket.query(cl.EqualClause('even', True)).delete(
+            concurrency=4, progress=lambda s: progress.append(s.total))
+
+        assert summary.succeeded == 5
+        assert progress == [1, 2, 3, 4, 5]
+        assert bucket.query().count() == 5
+        assert bucket.query(cl.EqualClause('even', True)).count() == 0
+
+    def test_query_delete_with_limit(self):
+        bucket = self.scope(BUCKET_ID)
+        bucket.create_objects({'index': i} for i in range(10))
+
+        summary = bucket.query().limit(3).delete()
+
+        assert summary.succeeded == 3
+        assert bucket.query().count() == 7
+
+    def test_retrieve_objects(self):
+        bucket = self.scope(BUCKET_ID)
+        summary = bucket.create_objects({'index': i} for i in range(10))
+        object_ids = [r.object_id for r in summary.results]
+
+        for by_query in (True, False):
+            objects = bucket.retrieve_objects(object_ids + ['missing'],
+                                              chunk_size=4,
+                                              concurrency=2,
+                                              by_query=by_query)
+
+            assert isinstance(objects, rs.ObjectsResult)
+            assert list(objects) == object_ids
+            assert objects.missing == ['missing']
+            for i, object_id in enumerate(object_ids):
+                assert isinstance(objects[object_id], rs.ObjectResult)
+                assert objects[object_id]['index'] == i
+
+    def test_export_and_import(self, tmp_path):
+        bucket = self.scope(BUCKET_ID)
+        bucket.create_objects({'index': i} for i in range(10))
+        path = tmp_path / 'bucket.ndjson.gz'
+        progress = []
+
+        assert bucket.export(path, progress=progress.append) == 10
+        assert progress[-1] == 10
+        assert not (tmp_path / 'bucket.ndjson.gz.state').exists()
+
+        objects = {obj._id: obj['index'] for obj in bucket.query()}
+        self.scope.delete_a_bucket(BUCKET_ID)
+
+        summary = bucket.import_(path, concurrency=4)
+
+        assert summary.succeeded == 10
+        assert {obj._id: obj['index'] for obj in bucket.query()} == objects
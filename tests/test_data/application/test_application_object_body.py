@@ -3,6 +3,7 @@ Precondition
     successfully pass a users test.
 '''
 from datetime import datetime, timedelta
+import io
 import time
 
 import pytest
@@ -86,6 +87,41 @@ class TestApplicationObjectBody:
         body_result = bucket.retrieve_an_object_body(obj._id)
         assert body_result.body == body.encode('utf-8')
 
+    def test_retrieve_an_object_body_as_stream(self):
+        cls = TestApplicationObjectBody
+        bucket = cls.scope(BUCKET_ID)
+
+        obj = bucket.query().one()
+
+        body = 'abcdefghijklmnopqrstuvwxyz'
+        bucket.add_or_replace_an_object_body(obj._id, body, 'text/plain')
+
+        body_result = bucket.retrieve_an_object_body(obj._id, stream=True)
+        assert b''.join(body_result.iter_content(4)) == body.encode('utf-8')
+
+        body_result = bucket.retrieve_an_object_body(obj._id, range=(2, 5))
+        assert body_result.body == b'cdef'
+        assert body_result.content_range == (2, 5, len(body))
+
+    def test_download_an_object_body(self):
+        cls = TestApplicationObjectBody
+        bucket = cls.scope(BUCKET_ID)
+
+        obj = bucket.query().one()
+
+        body = 'abcdefghijklmnopqrstuvwxyz' * 100
+        bucket.add_or_replace_an_object_body(obj._id, body, 'text/plain')
+
+        f = io.BytesIO()
+        written = bucket.download_an_object_body(obj._id, f)
+        assert written == len(body)
+        assert f.getvalue() == body.encode('utf-8')
+
+        f = io.BytesIO()
+        written = obj.download_body(f, piece_byte=100, concurrency=4)
+        assert written == len(body)
+        assert f.getvalue() == body.encode('utf-8')
+
     def test_add_or_replace_object_body(self):
         cls = TestApplicationObjectBody
         bucket = cls.scope(BUCKET_ID)
@@ -184,3 +184,35 @@ class TestApplicationQuery:
         count = query.count()
         assert len(results) == int(self.OBJ_COUNT / 2)
         assert count == int(self.OBJ_COUNT / 2)
+
+    def test_query_count_many(self):
+        cls = TestApplicationQuery
+        bucket = cls.scope(BUCKET_ID)
+
+        counts = bucket.count_many({
+            'all': None,
+            'even': cl.EqualClause('even', True),
+            'low': cl.RangeClause('index').lt(5),
+        }, concurrency=3)
+
+        assert counts == {'all': self.OBJ_COUNT, 'even': self.OBJ_COUNT // 2, 'low': 5}
+
+    def test_query_count_without_fetching(self):
+        cls = TestApplicationQuery
+        bucket = cls.scope(BUCKET_ID)
+
+        results = bucket.query().best_effort_limit(3).order_by('index', False) \
+                        .offset(2).limit(10).all()
+        assert results.count == 10
+        assert not results._cache_results
+        assert results
+        assert [r['index'] for r in results] == list(range(2, 12))
+
+        results = bucket.query().best_effort_limit(3).offset(self.OBJ_COUNT).all()
+        assert results.count == 0
+        assert not results
+
+        # list() calls len(), which reads the pages instead of counting
+        results = bucket.query().best_effort_limit(3).all()
+        assert len(list(results)) == self.OBJ_COUNT
+        assert results._count is None
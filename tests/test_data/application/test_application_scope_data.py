@@ -438,3 +438,55 @@ class TestApplicationScopeData:
         # pagination_key
         results = bucket.query_for_objects()
         assert len(results) == OBJ_COUNT
+
+    def test_object_cache(self):
+        self.scope.enable_object_cache(maxsize=10, ttl=0)
+        bucket = self.scope(BUCKET_ID)
+        assert bucket.object_cache is self.scope.object_cache
+
+        obj = bucket.create_an_object({'int key': 1})
+        info = bucket.retrieve_an_object(obj.object_id)
+        assert info['int key'] == 1
+
+        # revalidated with If-None-Match
+        info = bucket.retrieve_an_object(obj.object_id)
+        assert info['int key'] == 1
+        assert bucket.object_cache.revalidations == 1
+
+        # a returned object is a copy
+        info['int key'] = 100
+        assert bucket.retrieve_an_object(obj.object_id)['int key'] == 1
+
+        bucket.partially_update_an_object(obj.object_id, {'int key': 2})
+        assert bucket.retrieve_an_object(obj.object_id)['int key'] == 2
+
+        bucket.delete_an_object(obj.object_id)
+        with pytest.raises(exc.KiiObjectNotFoundError):
+            bucket.retrieve_an_object(obj.object_id)
+
+        self.scope.disable_object_cache()
+
+    def test_query_cache(self):
+        self.scope.enable_query_cache(maxsize=10, ttl=60)
+        bucket = self.scope(BUCKET_ID)
+        for i in range(5):
+            bucket.create_an_object({'index': i})
+
+        assert bucket.query().count() == 5
+        results = bucket.query().all()
+        assert len(results) == 5
+        assert len(bucket.query().offset(1).limit(2).all()) == 2
+        assert bucket.query_cache.hits == 0
+
+        assert len(bucket.query().all()) == 5
+        assert bucket.query_cache.hits == 1
+
+        # writes through the scope invalidate the bucket
+        bucket.create_an_object({'index': 5})
+        assert len(bucket.query().all()) == 6
+        assert bucket.query().count() == 6
+
+        bucket.delete_an_object(results[0]._id)
+        assert len(bucket.query().all()) == 5
+
+        self.scope.disable_query_cache()
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 import os
+import pathlib
 import time
 
 import pytest
@@ -157,3 +158,42 @@ class TestApplicationUpload:
 
         with open(filepath, 'rb') as f:
             self.obj.upload_body_multiple_pieces(f.read(), 'video/mp4')
+
+    def test_upload_body_multiple_pieces_concurrently(self):
+        b = self.api.data.application(BUCKET_ID)
+
+        filepath = os.path.join(os.path.dirname(__file__), '..', '..', 'test.mp4')
+
+        with open(filepath, 'rb') as f:
+            body = f.read()
+
+        b.upload_body_multiple_pieces(self.obj._id, body, 'video/mp4',
+                                      concurrency=4, retries=2)
+
+        uploaded = b.retrieve_an_object_body(self.obj._id)
+        assert uploaded.body == body
+
+    def test_upload_body_multiple_pieces_from_path(self):
+        b = self.api.data.application(BUCKET_ID)
+
+        filepath = pathlib.Path(os.path.dirname(__file__), '..', '..', 'test.mp4')
+
+        b.upload_body_multiple_pieces(self.obj._id, filepath, 'video/mp4', concurrency=2)
+
+        uploaded = b.retrieve_an_object_body(self.obj._id)
+        assert uploaded.body == filepath.read_bytes()
+
+    def test_upload_body_multiple_pieces_from_iterator(self):
+        b = self.api.data.application(BUCKET_ID)
+
+        filepath = os.path.join(os.path.dirname(__file__), '..', '..', 'test.mp4')
+
+        def chunks():
+            with open(filepath, 'rb') as f:
+                yield from iter(lambda: f.read(64 * 1024), b'')
+
+        b.upload_body_multiple_pieces(self.obj._id, chunks(), 'video/mp4')
+
+        uploaded = b.retrieve_an_object_body(self.obj._id)
+        with open(filepath, 'rb') as f:
+            assert uploaded.body == f.read()
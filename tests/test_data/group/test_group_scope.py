@@ -60,6 +60,18 @@ class TestGroupScopeBuckets:
         assert obj.data_type
         assert obj.data_type == 'application/json'
 
+    def test_write_with_caches(self):
+        # the group scope has no query nor retrieve helper to invalidate
+        self.scope.enable_object_cache().enable_query_cache()
+        try:
+            bucket = self.scope(self.group.group_id, BUCKET_ID)
+            obj = bucket.create_an_object({'int key': 1})
+            assert obj.object_id
+
+            self.scope.delete_a_bucket(self.group.group_id, BUCKET_ID)
+        finally:
+            self.scope.disable_object_cache().disable_query_cache()
+
     def test_retrieve_bucket(self):
         obj = self.scope(self.group.group_id, BUCKET_ID).create_an_object({
             'int key': 1,
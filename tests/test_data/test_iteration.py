@@ -3,6 +3,7 @@ Precondition
     successfully pass a users test.
 '''
 from datetime import datetime, timedelta
+import threading
 import time
 
 import pytest
@@ -269,3 +270,213 @@ class TestIteration:
                 assert bool(results) is True
 
         assert counter == self.OBJ_COUNT
+
+    def test_prefetch(self):
+        BEST_EFFORT_LIMIT = 2
+        results = self.bucket.query() \
+                             .best_effort_limit(BEST_EFFORT_LIMIT) \
+                             .prefetch(2) \
+                             .order_by('index', False).all()
+        assert len(results) == self.OBJ_COUNT
+        for i, r in enumerate(results):
+            assert r['index'] == i
+
+        # an abandoned result stops its thread on close()
+        running = threading.active_count()
+        results = self.bucket.query() \
+                             .best_effort_limit(BEST_EFFORT_LIMIT) \
+                             .prefetch(2) \
+                             .order_by('index', False).all()
+        assert results[3]['index'] == 3
+        results.close()
+        assert threading.active_count() == running
+        assert [r['index'] for r in results] == list(range(self.OBJ_COUNT))
+
+    def test_prefetch_and_limit(self):
+        LIMIT = 5
+        BEST_EFFORT_LIMIT = 2
+        results = self.bucket.query() \
+                             .best_effort_limit(BEST_EFFORT_LIMIT) \
+                             .limit(LIMIT) \
+                             .prefetch(3) \
+                             .order_by('index', False).all()
+        assert len(results) == LIMIT
+        for i, r in enumerate(results):
+            assert r['index'] == i
+
+    def test_stream(self):
+        BEST_EFFORT_LIMIT = 3
+        query = self.bucket.query() \
+                           .best_effort_limit(BEST_EFFORT_LIMIT) \
+                           .order_by('index', False)
+        for i, r in enumerate(query.stream()):
+            assert r['index'] == i
+        assert i == self.OBJ_COUNT - 1
+
+    def test_iter_pages(self):
+        OFFSET = 1
+        BEST_EFFORT_LIMIT = 3
+        pages = list(self.bucket.query()
+                                .best_effort_limit(BEST_EFFORT_LIMIT)
+                                .offset(OFFSET)
+                                .order_by('index', False)
+                                .iter_pages())
+        indexes = [r['index'] for page in pages for r in page]
+        assert indexes == list(range(OFFSET, self.OBJ_COUNT))
+        assert all(len(page) <= BEST_EFFORT_LIMIT + OFFSET for page in pages)
+
+    def test_as_records(self):
+        BEST_EFFORT_LIMIT = 3
+        results = self.bucket.query() \
+                             .best_effort_limit(BEST_EFFORT_LIMIT) \
+                             .order_by('index', False) \
+                             .as_records() \
+                             .all()
+        assert len(results) == self.OBJ_COUNT
+        for i, r in enumerate(results):
+            assert isinstance(r, rs.ObjectRecord)
+            assert not hasattr(r, '__dict__')
+            assert r['index'] == i
+            assert r._id
+            assert r.bucket_id == BUCKET_ID
+
+        r = results[0]
+        r.partially_update({'index': 100})
+        assert r.refresh()['index'] == 100
+
+    def test_as_dicts(self):
+        results = self.bucket.query().order_by('index', False).as_dicts().all()
+        assert len(results) == self.OBJ_COUNT
+        for i, r in enumerate(results):
+            assert type(r) is dict
+            assert r['index'] == i
+        assert results.json() == list(results)
+
+    def test_to_columns(self):
+        OFFSET = 1
+        query = self.bucket.query() \
+                           .best_effort_limit(3) \
+                           .offset(OFFSET) \
+                           .order_by('index', False)
+        columns = query.to_columns(['index', 'missing', '_created'])
+
+        assert list(columns['index']) == list(range(OFFSET, self.OBJ_COUNT))
+        assert len(columns['missing']) == self.OBJ_COUNT - OFFSET
+        assert len(columns['_created']) == self.OBJ_COUNT - OFFSET
+
+        index, = query.to_arrays(['index'], use_numpy=False)
+        assert list(index) == list(range(OFFSET, self.OBJ_COUNT))
+        assert isinstance(query.first(), rs.ObjectResult)
+
+    def test_resume(self, tmp_path):
+        def query():
+            return self.bucket.query().best_effort_limit(3).offset(1).order_by('index', False)
+
+        results = query().all()
+        stream = results.stream()
+        first = [next(stream)['index'] for _ in range(4)]
+        assert results.cursor.count == 4
+        assert not results.cursor.done
+
+        rest = [obj['index'] for obj in query().resume(results.cursor).stream()]
+        assert first + rest == list(range(1, self.OBJ_COUNT))
+
+        saved = []
+        pages = list(query().checkpoint(saved.append, every=2).iter_pages())
+        assert saved[-1].done
+        assert saved[-1].count == self.OBJ_COUNT - 1
+        assert len(pages) >= len(saved)
+        assert list(query().resume(saved[-1]).stream()) == []
+
+        path = tmp_path / 'cursor.json'
+        assert len(query().checkpoint(path).all()) == self.OBJ_COUNT - 1
+        assert rs.QueryCursor.load(path).done
+
+    def test_parallel_scan(self):
+        indexes = [obj['index'] for obj in self.bucket.parallel_scan(3)]
+        assert sorted(indexes) == list(range(self.OBJ_COUNT))
+
+        query = self.bucket.query(cl.EqualClause('even', True)).as_dicts()
+        objects = list(self.bucket.parallel_scan(2, 'index', query=query))
+        assert all(isinstance(obj, dict) for obj in objects)
+        assert sorted(obj['index'] for obj in objects) == list(range(0, self.OBJ_COUNT, 2))
+
+        objects = self.bucket.parallel_scan(4, 'index', bounds=(2, 5))
+        assert sorted(obj['index'] for obj in objects) == [2, 3, 4, 5]
+
+        # the bounds are found among the objects which have a number in index
+        self.bucket.create_an_object({'name': 'no index'})
+        self.bucket.create_an_object({'index': 'not a number'})
+        indexes = [obj['index'] for obj in self.bucket.parallel_scan(3, 'index')]
+        assert sorted(indexes) == list(range(self.OBJ_COUNT))
+
+    def test_lazy_indexing(self):
+        results = self.bucket.query().best_effort_limit(3).order_by('index', False).all()
+
+        assert results[1]['index'] == 1
+        assert [obj['index'] for obj in results[2:5]] == [2, 3, 4]
+        assert not results._finished
+
+        assert results[-1]['index'] == self.OBJ_COUNT - 1
+        assert results._finished
+        with pytest.raises(IndexError):
+            results[self.OBJ_COUNT]
+
+        query = self.bucket.query().order_by('index', False)
+        assert query.first()['index'] == 0
+        assert query._best_effort_limit is None
+
+    def test_keyset_pages(self):
+        query = self.bucket.query().order_by('index', False)
+
+        page = query.page(4)
+        assert isinstance(page, rs.Page)
+        assert [obj['index'] for obj in page] == [0, 1, 2, 3]
+
+        page = query.page(4, page.next_token)
+        assert [obj['index'] for obj in page] == [4, 5, 6, 7]
+
+        pages = list(query.pages(4))
+        assert [[obj['index'] for obj in page] for page in pages] == \
+            [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+        assert pages[-1].next_token is None
+
+        with pytest.raises(exc.KiiQueryNotOrderedError):
+            self.bucket.query().page(4)
+
+    def test_fan_out(self):
+        indexes = list(range(1, self.OBJ_COUNT, 2))
+        query = self.bucket.query(cl.InClause('index', indexes)).order_by('index', False)
+        assert [obj['index'] for obj in query.fan_out(2)] == indexes
+
+        query = self.bucket.query(cl.InClause('index', indexes)).order_by('index', True)
+        assert [obj['index'] for obj in query.fan_out(2, concurrency=2)] == indexes[::-1]
+
+        query = self.bucket.query(cl.InClause('index', indexes))
+        assert sorted(obj['index'] for obj in query.fan_out(2)) == indexes
+
+        # the odd ones are matched by both the InClause and the EqualClause
+        query = self.bucket.query(cl.OrClause(cl.InClause('index', indexes),
+                                              cl.EqualClause('even', False)))
+        objects = list(query.order_by('index', False).fan_out(2))
+        assert [obj['index'] for obj in objects] == indexes
+
+        objects = query.clone().offset(1).limit(2).fan_out(2)
+        assert [obj['index'] for obj in objects] == indexes[1:3]
+
+    def test_keyset_pages_without_the_field(self):
+        missing = [self.bucket.create_an_object({'name': 'no index'}).object_id
+                   for _ in range(5)]
+        all_ids = {obj._id for obj in self.bucket.query().all()}
+
+        for descending in (False, True):
+            query = self.bucket.query().order_by('index', descending)
+            objects = [obj for page in query.pages(4) for obj in page]
+            ids = [obj._id for obj in objects]
+            assert len(ids) == len(set(ids))
+            assert set(ids) == all_ids
+
+            # the objects with the field come first, in order
+            indexes = [obj['index'] for obj in objects[:self.OBJ_COUNT]]
+            assert indexes == sorted(range(self.OBJ_COUNT), reverse=descending)
+            assert set(ids[self.OBJ_COUNT:]) == set(missing)
@@ -0,0 +1,76 @@
+import asyncio
+import io
+
+import pytest
+
+from kii import AsyncKiiAPI, KiiAPI, exceptions as exc
+
+
+BODY = bytes(range(256)) * 40
+
+
+class Body:
+    def __init__(self, begin, end):
+        end = len(BODY) - 1 if end == '' else min(end, len(BODY) - 1)
+        self.body = BODY[begin:end + 1]
+        self.total_size = len(BODY)
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class Server:
+    """
+    serves ranges of BODY, failing the first given number of requests
+    """
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.ranges = []
+
+    def retrieve(self, object_id, range=None, stream=False):
+        self.ranges.append(range)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError
+        begin, end = range or (0, '')
+        return Body(begin, end)
+
+    async def aretrieve(self, object_id, range=None, stream=False):
+        return self.retrieve(object_id, range, stream)
+
+
+class TestDownload:
+    def test_failed_first_piece(self):
+        scope = KiiAPI('app_id', 'app_key', access_token='token').data.application('bucket')
+        server = Server(failures=3)
+        scope.retrieve_an_object_body = server.retrieve
+
+        target = io.BytesIO()
+        with pytest.raises(exc.KiiIncompleteDownloadError) as e:
+            scope.download_an_object_body('id', target, piece_byte=1000, concurrency=3)
+        # the size is unknown, so the rest of the body is missing
+        assert e.value.missing == [(0, '')]
+
+        written = scope.download_an_object_body('id', target, piece_byte=1000,
+                                                concurrency=3, ranges=e.value.missing)
+        assert written == len(BODY)
+        assert target.getvalue() == BODY
+
+    def test_async_pieces(self):
+        api = AsyncKiiAPI('app_id', 'app_key', access_token='token')
+        scope = api.data.application('bucket')
+        server = Server()
+        scope.retrieve_an_object_body = server.aretrieve
+
+        target = io.BytesIO()
+        written = asyncio.run(scope.download_an_object_body('id', target, piece_byte=1000))
+        assert written == len(BODY)
+        assert target.getvalue() == BODY
+        assert all(end - begin < 1000 for begin, end in server.ranges)
+
+        server = Server(failures=3)
+        scope.retrieve_an_object_body = server.aretrieve
+        with pytest.raises(exc.KiiIncompleteDownloadError) as e:
+            asyncio.run(scope.download_an_object_body('id', target, piece_byte=1000))
+        assert e.value.missing == [(0, '')]
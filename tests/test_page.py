@@ -0,0 +1,64 @@
+import pytest
+
+from kii import exceptions as exc
+from kii.data import clauses as cl
+from kii.data.application import QueryForObjects
+from kii.results.page import Page, decode_page_token, encode_page_token
+
+from tests.test_clauses import Scope
+
+
+class TestPageToken:
+    def test_round_trip(self):
+        token = encode_page_token('age', True, 20, ['id1', 'id2'])
+        assert decode_page_token(token, 'age', True) == (20, ['id1', 'id2'], False)
+
+        token = encode_page_token('age', True, 1500000000000, ['id3'], True)
+        assert decode_page_token(token, 'age', True) == (1500000000000, ['id3'], True)
+
+    def test_other_query(self):
+        token = encode_page_token('age', True, 20, [])
+        with pytest.raises(exc.KiiInvalidPageTokenError):
+            decode_page_token(token, 'name', True)
+        with pytest.raises(exc.KiiInvalidPageTokenError):
+            decode_page_token(token, 'age', False)
+
+    def test_garbage(self):
+        with pytest.raises(exc.KiiInvalidPageTokenError):
+            decode_page_token('not a token', 'age', True)
+
+    def test_page(self):
+        page = Page([1, 2], 'token')
+        assert page == [1, 2]
+        assert page.next_token == 'token'
+        assert Page().next_token is None
+
+
+class TestKeyset:
+    def test_phases(self):
+        query = QueryForObjects(Scope()).order_by('age', False)
+        first = query._keyset_query(2, None)
+        assert first.clause.query() == cl.has_field_clause('age').query()
+
+        items = [{'_id': 'a', 'age': 1, '_created': 10}, {'_id': 'b', 'age': 1, '_created': 5}]
+        page = query._keyset_page(items, 2, None)
+        assert decode_page_token(page.next_token, 'age', False) == (1, ['a', 'b'], False)
+
+        # the objects with the field ran out
+        page = query._keyset_page(items[:1], 2, page.next_token)
+        assert decode_page_token(page.next_token, 'age', False) == (None, [], True)
+
+        missing = query._keyset_query(2, page.next_token)
+        assert missing._order_by == '_created'
+        assert missing.clause.query() == \
+            cl.NotClause(cl.has_field_clause('age')).query()
+
+        items = [{'_id': 'c', '_created': 3}, {'_id': 'd', '_created': 4}]
+        page = query._keyset_page(items, 2, page.next_token)
+        assert decode_page_token(page.next_token, 'age', False) == (4, ['d'], True)
+        assert query._keyset_query(2, page.next_token).clause.query() == cl.AndClause(
+            cl.NotClause(cl.has_field_clause('age')),
+            cl.RangeClause('_created').ge(4),
+            cl.NotClause(cl.InClause('_id', ['d']))).query()
+
+        assert query._keyset_page(items[:1], 2, page.next_token).next_token is None
@@ -0,0 +1,18 @@
+from kii.data import partition_clauses
+
+
+def limits(clauses):
+    return [(c.lower_limit, c.upper_limit, c.upper_included) for c in clauses]
+
+
+class TestPartitionClauses:
+    def test_ints(self):
+        assert limits(partition_clauses('k', 0, 10, 4)) == [
+            (0, 2, False), (2, 5, False), (5, 7, False), (7, 10, True)]
+
+    def test_narrow_range(self):
+        assert limits(partition_clauses('k', 0, 1, 4)) == [(0, 1, True)]
+        assert limits(partition_clauses('k', 3, 3, 4)) == [(3, 3, True)]
+
+    def test_floats(self):
+        assert limits(partition_clauses('k', 0.0, 1.0, 2)) == [(0.0, 0.5, False), (0.5, 1.0, True)]
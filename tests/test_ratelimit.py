@@ -0,0 +1,57 @@
+import threading
+import time
+
+from kii import KiiAPI, RateLimiter
+from kii.data.application import CreateAnObject, QueryForObjects, RetrieveAnObject
+from kii.ratelimit import TokenBucket
+
+
+class TestRateLimiter:
+    def setup_method(self, method):
+        api = KiiAPI('app_id', 'app_key', access_token='token')
+        self.scope = api.data.application('bucket')
+
+    def test_burst(self):
+        bucket = TokenBucket(10, 3)
+        assert [bucket.reserve() for i in range(3)] == [0, 0, 0]
+        assert 0.09 < bucket.reserve() <= 0.1
+        assert 0.19 < bucket.reserve() <= 0.2
+
+    def test_threads(self):
+        bucket = TokenBucket(200, 1)
+        calls = []
+
+        def call():
+            for i in range(10):
+                time.sleep(bucket.reserve())
+                calls.append(time.monotonic())
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=call) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 40
+        assert time.monotonic() - start >= 39 / 200
+
+    def test_rate_class(self):
+        assert RateLimiter.rate_class(RetrieveAnObject(self.scope, 'id')) == 'read'
+        assert RateLimiter.rate_class(CreateAnObject(self.scope, {})) == 'write'
+        assert RateLimiter.rate_class(QueryForObjects(self.scope)) == 'query'
+
+    def test_limits(self):
+        limiter = RateLimiter(limits={'write': (10, 1)})
+        read = RetrieveAnObject(self.scope, 'id')
+        write = CreateAnObject(self.scope, {})
+
+        assert limiter.reserve(write) == 0
+        assert limiter.reserve(read) == 0
+        assert limiter.reserve(read) == 0
+        assert limiter.reserve(write) > 0
+
+    def test_clone_shares_limiter(self):
+        limiter = RateLimiter(10)
+        api = KiiAPI('app_id', 'app_key', rate_limiter=limiter)
+        assert api.clone().rate_limiter is limiter
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+import requests
+
+from kii import codec, results as rs
+
+
+def response(body):
+    r = requests.Response()
+    r.status_code = 200
+    r._content = json.dumps(body).encode('utf-8') if body is not None else b''
+    return r
+
+
+class TestLazyResults:
+    def test_decoded_on_first_access(self):
+        r = response({'_id': 'id', '_created': 1500000000000})
+        result = rs.ObjectResult(None, r)
+        assert '_result' not in result.__dict__
+        assert result.status_code == 200
+        assert '_result' not in result.__dict__
+
+        assert result['_id'] == 'id'
+        assert '_result' in result.__dict__
+
+    def test_empty_body(self):
+        result = rs.DeleteResult(None, response(None))
+        assert not result
+        assert str(result) == '""'
+
+    def test_timestamps(self):
+        result = rs.ObjectResult(None, response({'_created': 1500000000000}))
+        created = result._created
+        assert created is result._created
+
+        result['_created'] += 1000
+        assert (result._created - created).total_seconds() == 1
+
+    def test_record_timestamps(self):
+        record = rs.ObjectRecord(None, {'_modified': 1500000000000})
+        assert record._modified is record._modified
+        assert not hasattr(record, '__dict__')
+
+
+class TestCodec:
+    def teardown_method(self, method):
+        codec.set_json_decoder('json')
+
+    def test_set_json_decoder(self):
+        codec.set_json_decoder('auto')
+        assert codec.loads(b'{"a": 1}') == {'a': 1}
+
+        calls = []
+
+        def loads(content):
+            calls.append(content)
+            return json.loads(content)
+
+        codec.set_json_decoder(loads)
+        assert rs.ObjectResult(None, response({'a': 1}))['a'] == 1
+        assert calls == [b'{"a": 1}']
+
+        with pytest.raises(ValueError):
+            codec.set_json_decoder('unknown')
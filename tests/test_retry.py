@@ -0,0 +1,62 @@
+import io
+
+from kii import KiiAPI, RetryPolicy
+from kii.data.application import CreateAnObject, QueryForObjects, RetrieveAnObject
+from kii.retry import parse_retry_after
+
+
+class Response:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+
+class TestRetryPolicy:
+    def setup_method(self, method):
+        api = KiiAPI('app_id', 'app_key', access_token='token')
+        self.scope = api.data.application('bucket')
+        self.policy = RetryPolicy(max_attempts=3, backoff=1, jitter=False)
+
+    def test_idempotent(self):
+        assert self.policy.is_idempotent(RetrieveAnObject(self.scope, 'id'))
+        assert self.policy.is_idempotent(QueryForObjects(self.scope))
+        assert not self.policy.is_idempotent(CreateAnObject(self.scope, {}))
+
+    def test_retry_status(self):
+        get = RetrieveAnObject(self.scope, 'id')
+        post = CreateAnObject(self.scope, {})
+
+        assert self.policy.retry_status(get, 1, 503, {}) == 503
+        assert self.policy.retry_status(get, 1, 404, {}) is None
+        assert self.policy.retry_status(get, 3, 503, {}) is None
+        assert self.policy.retry_status(post, 1, 503, {}) is None
+        assert self.policy.retry_status(post, 1, 429, {}) == 429
+
+    def test_streamed_body_is_not_replayed(self):
+        get = RetrieveAnObject(self.scope, 'id')
+        assert self.policy.retry_status(get, 1, 503, {'data': b'body'}) == 503
+        assert self.policy.retry_status(get, 1, 503, {'data': io.BytesIO(b'body')}) is None
+
+    def test_retry_error(self):
+        post = CreateAnObject(self.scope, {})
+        error = ConnectionError()
+        assert self.policy.retry_error(post, 1, error, {}) is None
+        assert self.policy.retry_error(post, 1, error, {}, sent=False) == 'ConnectionError'
+
+    def test_delay(self):
+        assert self.policy.delay(1) == 1
+        assert self.policy.delay(3) == 4
+        assert self.policy.delay(10) == self.policy.max_backoff
+        assert self.policy.delay(1, Response({'Retry-After': '5'})) == 5
+
+        jittered = RetryPolicy(backoff=1)
+        assert 0 <= jittered.delay(2) <= 2
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('3') == 3
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+        assert parse_retry_after('soon') is None
+
+    def test_clone_shares_policy(self):
+        api = KiiAPI('app_id', 'app_key', retry=self.policy)
+        assert api.clone().retry is self.policy
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from kii import AsyncKiiAPI, KiiAPI, RateLimiter, RetryPolicy
+from kii.transport import AsyncTransport
+
+
+class TestTransport:
+    def test_clone_shares_the_pool(self):
+        api = KiiAPI('app_id', 'app_key', pool_maxsize=4,
+                     retry=RetryPolicy(), rate_limiter=RateLimiter(10))
+        clone = api.clone(access_token='token')
+
+        assert clone.transport is api.transport
+        assert clone.retry is api.retry
+        assert clone.rate_limiter is api.rate_limiter
+        assert clone.transport.pool_maxsize == 4
+        api.close()
+
+
+class TestAsyncTransport:
+    def test_session_of_a_previous_loop_is_closed(self):
+        transport = AsyncTransport()
+        first = asyncio.run(transport._session())
+        second = asyncio.run(transport._session())
+
+        assert first is not second
+        assert first.closed
+        assert not second.closed
+        asyncio.run(transport.close())
+        assert second.closed
+
+    def test_pool_block(self):
+        assert AsyncTransport().pool_block
+        assert AsyncKiiAPI('app_id', 'app_key').transport.pool_block
+        with pytest.raises(ValueError):
+            AsyncTransport(pool_block=False)
+        with pytest.raises(ValueError):
+            AsyncKiiAPI('app_id', 'app_key', pool_block=False)
+
+    def test_sync_with(self):
+        api = AsyncKiiAPI('app_id', 'app_key')
+        with pytest.raises(TypeError):
+            with api:
+                pass
+        with pytest.raises(TypeError):
+            with api.transport:
+                pass
+
+        async def scenario():
+            async with api:
+                pass
+
+        asyncio.run(scenario())
@@ -0,0 +1,111 @@
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+
+from kii.utils import abounded_map, ainterleave, body_view, interleave
+
+
+class TestInterleave:
+    def test_ahead(self):
+        fetched = []
+
+        def items():
+            for i in range(10):
+                fetched.append(i)
+                yield i
+
+        iterator = interleave([items()], 2)
+        assert next(iterator) == 0
+        time.sleep(0.2)
+        assert fetched == [0, 1, 2]
+        iterator.close()
+
+    def test_close(self):
+        def items():
+            while True:
+                yield 1
+
+        running = threading.active_count()
+        iterator = interleave([items(), items()], 2)
+        assert next(iterator) == 1
+        iterator.close()
+        assert threading.active_count() == running
+
+    def test_ahead_async(self):
+        fetched = []
+
+        async def items():
+            for i in range(10):
+                fetched.append(i)
+                yield i
+
+        async def scenario():
+            iterator = ainterleave([items()], 2)
+            assert await iterator.__anext__() == 0
+            await asyncio.sleep(0.05)
+            assert fetched == [0, 1, 2]
+            await iterator.aclose()
+
+        asyncio.run(scenario())
+
+
+class TestBoundedMap:
+    def test_lazy(self):
+        started = []
+
+        async def fn(item):
+            started.append(item)
+            await asyncio.sleep(0.01)
+            return item * 2
+
+        def items():
+            for i in range(20):
+                # no more than 2 * concurrency tasks are created ahead
+                assert i - len(started) <= 4
+                yield i
+
+        assert asyncio.run(abounded_map(fn, items(), 2)) == [i * 2 for i in range(20)]
+
+    def test_error_cancels_the_others(self):
+        finished, cancelled = [], []
+
+        async def fn(item):
+            if item == 1:
+                raise ValueError
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(item)
+                raise
+            finished.append(item)
+
+        async def scenario():
+            with pytest.raises(ValueError):
+                await abounded_map(fn, range(6), 3)
+
+        start = time.perf_counter()
+        asyncio.run(scenario())
+        assert time.perf_counter() - start < 0.5
+        assert finished == []
+        assert {0, 2} <= set(cancelled)
+
+
+class TestBodyView:
+    def test_bytesio_is_released(self):
+        body = io.BytesIO(b'abcdef')
+        body.seek(2)
+        with body_view(body) as view:
+            piece = view[0:2]
+            assert bytes(piece) == b'cd'
+        del piece
+
+        body.write(b'x')
+        body.truncate(3)
+        assert body.getvalue() == b'abx'
+
+    def test_iterable(self):
+        with body_view(iter([b'ab', 'cd'])) as view:
+            assert bytes(view) == b'abcd'